@@ -10,7 +10,7 @@ from typing import List
 from fastapi import APIRouter, HTTPException, Depends, status
 
 from app.core.models import ApiUser, ApiUserCreate, ApiUserUpdate, ApiUserWithKey
-from app.api.auth import require_admin
+from app.api.auth import require_admin, ws_auth_cache, ws_auth_reject_cache
 from app.db import database as db
 
 router = APIRouter(prefix="/api/v1/api-users", tags=["API Users"])
@@ -125,6 +125,8 @@ async def update_api_user(
         description=request.description,
         is_active=request.is_active
     )
+    ws_auth_cache.clear()
+    ws_auth_reject_cache.clear()
 
     return user
 
@@ -144,6 +146,7 @@ async def regenerate_api_key(user_id: str, token: str = Depends(require_admin)):
     api_key_hash = hash_api_key(api_key)
 
     user = db.update_api_user_key(user_id, api_key_hash)
+    ws_auth_cache.clear()
 
     return {**user, "api_key": api_key}
 
@@ -156,3 +159,4 @@ async def delete_api_user(user_id: str, token: str = Depends(require_admin)):
             status_code=status.HTTP_404_NOT_FOUND,
             detail="API user not found"
         )
+    ws_auth_cache.clear()
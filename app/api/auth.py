@@ -3,6 +3,7 @@ Authentication API routes
 """
 
 import os
+import asyncio
 import hashlib
 import secrets
 import subprocess
@@ -18,12 +19,20 @@ from app.core.models import (
 )
 from app.core.auth import auth_service
 from app.core.config import settings
+from app.core.ttl_cache import TTLCache
 from app.db import database as db
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/auth", tags=["Authentication"])
 
+# Validated WebSocket tokens -> api_user (None for admin). Lets reconnect storms
+# skip the session/API-key DB lookups; cleared on logout and API user changes.
+ws_auth_cache = TTLCache(maxsize=4096, ttl=settings.ws_auth_cache_ttl)
+# Rejected WebSocket tokens, kept briefly so reconnect loops with a stale token
+# don't repeat the lookups; cleared when an API user is reactivated.
+ws_auth_reject_cache = TTLCache(maxsize=4096, ttl=settings.ws_auth_reject_cache_ttl)
+
 
 def get_client_ip(request: Request) -> str:
     """Get the real client IP address, respecting reverse proxy headers"""
@@ -288,7 +297,7 @@ async def setup_admin(request: SetupRequest, response: Response):
         )
 
     try:
-        result = auth_service.setup_admin(request.username, request.password)
+        result = await auth_service.setup_admin_async(request.username, request.password)
 
         # Set session cookie
         response.set_cookie(
@@ -319,7 +328,7 @@ async def login(req: Request, login_data: LoginRequest, response: Response):
     # Check rate limiting before attempting login
     check_rate_limit(req, login_data.username)
 
-    token = auth_service.login(login_data.username, login_data.password)
+    token = await auth_service.login_async(login_data.username, login_data.password)
 
     if not token:
         # Record failed attempt
@@ -418,6 +427,7 @@ async def logout(request: Request, response: Response):
         auth_service.logout(token)
         # Also try to delete API key session if exists
         db.delete_api_key_session(token)
+        ws_auth_cache.clear()
 
     response.delete_cookie(key="session")
     return {"status": "ok", "message": "Logged out"}
@@ -524,7 +534,8 @@ async def claude_login_complete(request: Request, token: str = Depends(require_a
 @router.post("/claude/logout")
 async def claude_logout(token: str = Depends(require_admin)):
     """Logout from Claude CLI"""
-    return auth_service.claude_logout()
+    # `claude logout` can take up to 30s; run it without stalling the event loop
+    return await asyncio.to_thread(auth_service.claude_logout)
 
 
 # =========================================================================
@@ -6,7 +6,7 @@ import json
 import logging
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Query, status
 from fastapi.responses import StreamingResponse
 
 from app.core.models import (
@@ -20,6 +20,29 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1", tags=["Query"])
 
+# Headers for SSE responses - "Content-Encoding: identity" keeps GZipMiddleware
+# and reverse proxies from buffering/compressing the event stream, and nosniff
+# lets intermediaries skip content sniffing that delays the first byte.
+# No Content-Length is set, so Starlette streams with chunked transfer encoding.
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",
+    "X-Content-Type-Options": "nosniff",
+    "Content-Encoding": "identity"
+}
+
+# Precomputed "event: <type>\ndata: " prefixes, filled lazily per event type
+_SSE_PREFIXES: dict = {}
+
+
+def _sse_prefix(event_type: str) -> str:
+    """Return the cached SSE line prefix for an event type"""
+    prefix = _SSE_PREFIXES.get(event_type)
+    if prefix is None:
+        prefix = _SSE_PREFIXES[event_type] = f"event: {event_type}\ndata: "
+    return prefix
+
 
 def require_claude_auth():
     """Dependency that requires Claude CLI authentication"""
@@ -64,10 +87,11 @@ async def one_shot_query(
             api_user_id=api_user.get("id")
         )
 
+        # Metadata is built internally by execute_query, so skip re-validation
         return {
             "response": result["response"],
             "session_id": result["session_id"],
-            "metadata": QueryMetadata(**result["metadata"])
+            "metadata": QueryMetadata.model_construct(**result["metadata"])
         }
 
     except ValueError as e:
@@ -109,16 +133,14 @@ async def stream_one_shot_query(
             if request.overrides:
                 overrides = request.overrides.model_dump(exclude_none=True)
 
-            async for event in stream_query(
+            async for event_type, event in stream_query(
                 prompt=request.prompt,
                 profile_id=profile_id,
                 project_id=project_id,
                 overrides=overrides,
                 api_user_id=api_user.get("id")
             ):
-                event_type = event.get("type", "message")
-                data = json.dumps(event)
-                yield f"event: {event_type}\ndata: {data}\n\n"
+                yield _sse_prefix(event_type) + json.dumps(event) + "\n\n"
 
         except Exception as e:
             logger.error(f"Stream error: {e}")
@@ -128,11 +150,7 @@ async def stream_one_shot_query(
     return StreamingResponse(
         event_generator(),
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no"
-        }
+        headers=SSE_HEADERS
     )
 
 
@@ -172,10 +190,11 @@ async def conversation(
             api_user_id=api_user.get("id")
         )
 
+        # Metadata is built internally by execute_query, so skip re-validation
         return {
             "response": result["response"],
             "session_id": result["session_id"],
-            "metadata": QueryMetadata(**result["metadata"])
+            "metadata": QueryMetadata.model_construct(**result["metadata"])
         }
 
     except ValueError as e:
@@ -218,7 +237,7 @@ async def stream_conversation(
             if request.overrides:
                 overrides = request.overrides.model_dump(exclude_none=True)
 
-            async for event in stream_query(
+            async for event_type, event in stream_query(
                 prompt=request.prompt,
                 profile_id=profile_id,
                 project_id=project_id,
@@ -227,9 +246,7 @@ async def stream_conversation(
                 api_user_id=api_user_id,
                 device_id=request.device_id  # Pass device ID for cross-device sync
             ):
-                event_type = event.get("type", "message")
-                data = json.dumps(event)
-                yield f"event: {event_type}\ndata: {data}\n\n"
+                yield _sse_prefix(event_type) + json.dumps(event) + "\n\n"
 
         except Exception as e:
             logger.error(f"Stream error: {e}")
@@ -239,11 +256,7 @@ async def stream_conversation(
     return StreamingResponse(
         event_generator(),
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no"
-        }
+        headers=SSE_HEADERS
     )
 
 
@@ -334,11 +347,13 @@ async def interrupt(
 
 @router.get("/streaming/active")
 async def list_active_sessions(
+    limit: int = Query(100, ge=1, le=500),
+    since_ts: Optional[float] = Query(None, description="Only sessions active after this Unix timestamp"),
     token: str = Depends(require_auth)
 ):
     """
-    List all currently streaming sessions (actively generating responses).
+    List currently streaming sessions (actively generating responses), most recent first.
     Note: This returns sessions that are actively streaming, not just connected.
     """
     from app.core.query_engine import get_streaming_sessions
-    return {"active_sessions": get_streaming_sessions()}
+    return {"active_sessions": get_streaming_sessions(limit=limit, updated_since=since_ts)}
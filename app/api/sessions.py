@@ -2,49 +2,247 @@
 Session management API routes
 """
 
-from typing import List, Optional
-
-from fastapi import APIRouter, HTTPException, Depends, Query, status, Request
+import json
+import time
+import hashlib
+import base64
+import asyncio
+from operator import itemgetter
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Depends, Query, status, Request, Response
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
 
-from app.core.models import Session, SessionWithMessages
+from app.core.models import Session, SessionWithMessages, SessionMessage
+from app.core.config import settings
 from app.db import database
 from app.api.auth import require_auth, get_api_user_from_request
 
 router = APIRouter(prefix="/api/v1/sessions", tags=["Sessions"])
 
 
+# (project_id, profile_id) extractor shared by API user and session rows
+_access_scope = itemgetter("project_id", "profile_id")
+
+
 class BatchDeleteRequest(BaseModel):
     """Request body for batch delete operation"""
     session_ids: List[str]
 
 
+# Short-lived cache of session list results, keyed by the effective filters.
+# Writes through this router bump _sessions_list_version so they show up
+# immediately; writes elsewhere (e.g. query cost updates) are bounded by the TTL.
+_SESSIONS_LIST_CACHE_MAX = 1024
+_sessions_list_cache: Dict[tuple, Tuple[float, int, list]] = {}
+_sessions_list_version = 0
+
+
+def invalidate_sessions_list_cache() -> None:
+    """Invalidate cached session list results after a session write"""
+    global _sessions_list_version
+    _sessions_list_version += 1
+    _sessions_list_cache.clear()
+
+
+def _get_cached_sessions_list(key: tuple) -> Optional[list]:
+    entry = _sessions_list_cache.get(key)
+    if entry is None:
+        return None
+    expires_at, version, sessions = entry
+    if version != _sessions_list_version or expires_at < time.monotonic():
+        _sessions_list_cache.pop(key, None)
+        return None
+    return sessions
+
+
+def _set_cached_sessions_list(key: tuple, sessions: list, version: int) -> None:
+    if len(_sessions_list_cache) >= _SESSIONS_LIST_CACHE_MAX:
+        # Drop the oldest entry (dicts keep insertion order)
+        _sessions_list_cache.pop(next(iter(_sessions_list_cache)))
+    _sessions_list_cache[key] = (
+        time.monotonic() + settings.sessions_list_cache_ttl,
+        version,
+        sessions
+    )
+
+
+# Column order for columnar message output
+_MESSAGE_FIELDS = list(SessionMessage.model_fields)
+
+
+def _transform_jsonl_message(index: int, m: dict) -> dict:
+    """
+    Map a parsed JSONL message onto the SessionWithMessages message shape.
+
+    Written as one dict literal (a single BUILD_MAP) since every message has the
+    same shape - measurably faster than copying fields in a loop on long sessions.
+    camelCase is for the frontend; tool_name/tool_input are snake_case aliases.
+    """
+    get = m.get
+    tool_name = get("toolName")
+    tool_input = get("toolInput")
+    msg_type = get("type")
+    msg_data = {
+        "id": get("id", index),
+        "role": get("role", "user"),
+        "content": get("content", ""),
+        "type": msg_type,  # Critical for tool_use/tool_result rendering
+        "subtype": get("subtype"),  # For system messages (e.g., local_command)
+        "toolName": tool_name,
+        "toolInput": tool_input,
+        "toolId": get("toolId"),
+        "toolResult": get("toolResult"),  # Tool output grouped with tool_use
+        "toolStatus": get("toolStatus"),  # Status: running, complete, error
+        "tool_name": tool_name,
+        "tool_input": tool_input,
+        "metadata": get("metadata"),
+        # Raw timestamp strings stay in metadata; let Pydantic default created_at
+        "created_at": None
+    }
+    if msg_type == "subagent":
+        msg_data["agentId"] = get("agentId")
+        msg_data["agentType"] = get("agentType")
+        msg_data["agentDescription"] = get("agentDescription")
+        msg_data["agentStatus"] = get("agentStatus")
+        msg_data["agentChildren"] = get("agentChildren")
+    return msg_data
+
+
+def _transform_db_message(m: dict) -> dict:
+    """Add frontend type/camelCase tool fields to a legacy DB message"""
+    msg = dict(m)
+    # Infer type from role for legacy DB messages
+    if msg.get("tool_name"):
+        msg["type"] = "tool_use"
+        msg["toolName"] = msg["tool_name"]
+        msg["toolInput"] = msg.get("tool_input")
+    elif msg.get("role") == "assistant":
+        msg["type"] = "text"
+    return msg
+
+
+def to_columnar(rows: List[dict], fields: Optional[List[str]] = None) -> dict:
+    """
+    Convert a list of row dicts into a columnar {"length", "fields", "columns"} object.
+
+    Each key is sent once instead of once per row, which shrinks long message
+    histories considerably. Rows missing a field get null in that column.
+    Clients rebuild row i as {f: columns[f][i] for f in fields}.
+    """
+    if fields is None:
+        # Union of keys in first-seen order, for heterogeneous rows
+        fields = list(dict.fromkeys(key for row in rows for key in row))
+    return {
+        "length": len(rows),
+        "fields": fields,
+        "columns": {f: [row.get(f) for row in rows] for f in fields}
+    }
+
+
+def _session_etag(session: dict, working_dir: str, *variant: Any) -> str:
+    """
+    Weak ETag for a session's detail view.
+
+    Covers the DB row's updated_at, the latest sync log ID (bumped on every
+    message/stream event), the latest stored message ID (DB-backed sessions
+    gain messages without a sync event) and the JSONL file's mtime/size,
+    which changes on rewinds and CLI activity that don't touch the DB.
+    """
+    from app.core.jsonl_parser import get_session_jsonl_path
+
+    jsonl_state = None
+    sdk_session_id = session.get("sdk_session_id")
+    if sdk_session_id:
+        jsonl_path = get_session_jsonl_path(sdk_session_id, working_dir)
+        if jsonl_path:
+            try:
+                st = jsonl_path.stat()
+                jsonl_state = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                pass
+
+    parts = (
+        session["id"], session.get("updated_at"),
+        database.get_session_change_state(session["id"]), jsonl_state, variant
+    )
+    return f'W/"{hashlib.sha1(repr(parts).encode()).hexdigest()}"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Check an If-None-Match header (possibly a list, or *) against an ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {tag.strip() for tag in header.split(",")}
+    return etag in candidates or "*" in candidates
+
+
+def encode_session_cursor(session: dict) -> str:
+    """Encode a session's (updated_at, id) position as an opaque pagination cursor"""
+    raw = json.dumps([session["updated_at"], session["id"]]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_session_cursor(cursor: str) -> Tuple[str, str]:
+    """Decode a pagination cursor back into an (updated_at, id) tuple"""
+    try:
+        updated_at, session_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (str(updated_at), str(session_id))
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def has_session_access(api_user: Optional[dict], session: dict) -> bool:
+    """Check an already-resolved API user (None for admin) against a session's project/profile scope."""
+    if not api_user:
+        return True  # Admin has full access
+
+    api_project, api_profile = _access_scope(api_user)
+    session_project, session_profile = _access_scope(session)
+
+    # Project restriction applies only when both sides are scoped to a project;
+    # profile restriction applies whenever the API user is scoped to a profile
+    return not (
+        (api_project and session_project and api_project != session_project) or
+        (api_profile and api_profile != session_profile)
+    )
+
+
 def check_session_access(request: Request, session: dict) -> None:
     """Check if API user has access to a session based on project/profile restrictions."""
-    api_user = get_api_user_from_request(request)
-    if not api_user:
-        return  # Admin has full access
+    if not has_session_access(get_api_user_from_request(request), session):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this session"
+        )
+
 
-    # Check project restriction
-    if api_user.get("project_id") and session.get("project_id"):
-        if api_user["project_id"] != session["project_id"]:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied to this session"
-            )
+async def require_session_access(
+    request: Request,
+    session_id: str,
+    token: str = Depends(require_auth)
+) -> dict:
+    """Dependency: load a session by path ID, 404 if missing, 403 if the caller can't access it."""
+    session = await asyncio.to_thread(database.get_session, session_id)
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Session not found: {session_id}"
+        )
 
-    # Check profile restriction
-    if api_user.get("profile_id"):
-        if api_user["profile_id"] != session.get("profile_id"):
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied to this session"
-            )
+    check_session_access(request, session)
+    return session
 
 
 @router.get("", response_model=List[Session])
 async def list_sessions(
     request: Request,
+    response: Response,
     project_id: Optional[str] = Query(None, description="Filter by project"),
     profile_id: Optional[str] = Query(None, description="Filter by profile"),
     status_filter: Optional[str] = Query(None, alias="status", description="Filter by status"),
@@ -52,11 +250,18 @@ async def list_sessions(
     admin_only: bool = Query(False, description="Show only admin sessions (no API user)"),
     api_users_only: bool = Query(False, description="Show only API user sessions (exclude admin sessions)"),
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    offset: int = Query(0, ge=0, description="Deprecated - use cursor instead"),
+    cursor: Optional[str] = Query(None, description="Pagination cursor from the X-Next-Cursor header of the previous page"),
     token: str = Depends(require_auth)
 ):
-    """List sessions with optional filters. API users only see sessions for their assigned project/profile."""
+    """
+    List sessions with optional filters. API users only see sessions for their assigned project/profile.
+
+    When a full page is returned, the X-Next-Cursor response header holds the cursor
+    for the next page.
+    """
     api_user = get_api_user_from_request(request)
+    before = decode_session_cursor(cursor) if cursor else None
 
     # Force API user restrictions
     if api_user:
@@ -83,20 +288,44 @@ async def list_sessions(
     elif api_user_id:
         filter_api_user_id = api_user_id
 
-    sessions = database.get_sessions(
-        project_id=project_id,
-        profile_id=profile_id,
-        status=status_filter,
-        api_user_id=filter_api_user_id,
-        api_users_only=filter_api_users_only,
-        limit=limit,
-        offset=offset
+    cache_key = (
+        project_id, profile_id, status_filter, filter_api_user_id,
+        filter_api_users_only, limit, offset, before, api_user and api_user["id"]
     )
+    sessions = _get_cached_sessions_list(cache_key) if settings.sessions_list_cache_ttl > 0 else None
+    if sessions is None:
+        # Tag with the version seen before querying so a concurrent write wins
+        version = _sessions_list_version
+        sessions = await asyncio.to_thread(
+            database.get_sessions,
+            project_id=project_id,
+            profile_id=profile_id,
+            status=status_filter,
+            api_user_id=filter_api_user_id,
+            api_users_only=filter_api_users_only,
+            limit=limit,
+            offset=offset,
+            before=before
+        )
+        if settings.sessions_list_cache_ttl > 0:
+            _set_cached_sessions_list(cache_key, sessions, version)
+
+    if len(sessions) == limit:
+        response.headers["X-Next-Cursor"] = encode_session_cursor(sessions[-1])
+
     return sessions
 
 
 @router.get("/{session_id}", response_model=SessionWithMessages)
-async def get_session(request: Request, session_id: str, token: str = Depends(require_auth)):
+async def get_session(
+    request: Request,
+    session_id: str,
+    message_format: str = Query(
+        "rows", alias="format", pattern="^(rows|columnar)$",
+        description="'columnar' returns messages as parallel arrays (see to_columnar)"
+    ),
+    session: dict = Depends(require_session_access)
+):
     """Get a session with its message history. API users can only access their assigned sessions."""
     import logging
     import traceback
@@ -104,70 +333,37 @@ async def get_session(request: Request, session_id: str, token: str = Depends(re
 
     logger.info(f"Loading session: {session_id}")
 
-    session = database.get_session(session_id)
-    if not session:
-        logger.warning(f"Session not found in database: {session_id}")
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Session not found: {session_id}"
-        )
-
-    check_session_access(request, session)
-
-    # Try to load messages from JSONL file first (source of truth for consistency)
     sdk_session_id = session.get("sdk_session_id")
     messages = []
     working_dir = "/workspace"
 
+    # Get working dir from project if available
+    project_id = session.get("project_id")
+    if project_id:
+        project = await asyncio.to_thread(database.get_project, project_id)
+        if project:
+            working_dir = str(settings.workspace_dir / project["path"])
+
+    # Skip parsing and encoding entirely when the client's copy is still current
+    etag = await asyncio.to_thread(
+        _session_etag, session, working_dir, message_format
+    )
+    if _etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    # Try to load messages from JSONL file first (source of truth for consistency)
     if sdk_session_id:
         try:
-            from app.core.jsonl_parser import parse_session_history, get_session_cost_from_jsonl
-            from app.core.config import settings
-
-            # Get working dir from project if available
-            project_id = session.get("project_id")
-            if project_id:
-                project = database.get_project(project_id)
-                if project:
-                    working_dir = str(settings.workspace_dir / project["path"])
+            from app.core.jsonl_parser import parse_session
 
-            jsonl_messages = parse_session_history(sdk_session_id, working_dir)
+            # One pass over the JSONL file yields both the messages and token usage
+            jsonl_messages, usage_data = await asyncio.to_thread(parse_session, sdk_session_id, working_dir)
             if jsonl_messages:
                 # Transform to expected format for SessionWithMessages
-                # Use camelCase for frontend compatibility (toolName, toolInput, toolId)
-                for i, m in enumerate(jsonl_messages):
-                    # Get timestamp from metadata, ensuring it's properly formatted
-                    timestamp = m.get("metadata", {}).get("timestamp")
-                    # Don't pass raw timestamp strings to Pydantic datetime field
-                    # The frontend handles timestamp display from metadata anyway
-                    msg_data = {
-                        "id": m.get("id", i),
-                        "role": m.get("role", "user"),
-                        "content": m.get("content", ""),
-                        "type": m.get("type"),  # Critical for tool_use/tool_result rendering
-                        "subtype": m.get("subtype"),  # For system messages (e.g., local_command)
-                        "toolName": m.get("toolName"),  # camelCase for frontend
-                        "toolInput": m.get("toolInput"),  # camelCase for frontend
-                        "toolId": m.get("toolId"),
-                        "toolResult": m.get("toolResult"),  # Tool output grouped with tool_use
-                        "toolStatus": m.get("toolStatus"),  # Status: running, complete, error
-                        "tool_name": m.get("toolName"),  # Also include snake_case for compatibility
-                        "tool_input": m.get("toolInput"),  # Also include snake_case for compatibility
-                        "metadata": m.get("metadata"),
-                        "created_at": None  # Let Pydantic use default; timestamp is in metadata
-                    }
-                    # Include subagent-specific fields if present
-                    if m.get("type") == "subagent":
-                        msg_data["agentId"] = m.get("agentId")
-                        msg_data["agentType"] = m.get("agentType")
-                        msg_data["agentDescription"] = m.get("agentDescription")
-                        msg_data["agentStatus"] = m.get("agentStatus")
-                        msg_data["agentChildren"] = m.get("agentChildren")
-                    messages.append(msg_data)
-
-            # Get token usage from JSONL - always load cache tokens since they're not in DB
-            # Also load input/output tokens if database doesn't have them
-            usage_data = get_session_cost_from_jsonl(sdk_session_id, working_dir)
+                messages = [_transform_jsonl_message(i, m) for i, m in enumerate(jsonl_messages)]
+
+            # Token usage from JSONL - always use cache tokens since they're not in DB
+            # Also use input/output tokens if database doesn't have them
             logger.info(f"[Session API] JSONL usage_data for {session_id}: {usage_data}")
             if usage_data:
                 # Cache tokens are only in JSONL, always use those
@@ -192,72 +388,57 @@ async def get_session(request: Request, session_id: str, token: str = Depends(re
 
     # Fall back to database if JSONL not available or failed to parse
     if not messages:
-        db_messages = database.get_session_messages(session_id)
+        db_messages = await asyncio.to_thread(database.get_session_messages, session_id)
         # Transform DB messages to include type field for frontend compatibility
-        for m in db_messages:
-            msg = dict(m)
-            # Infer type from role for legacy DB messages
-            if msg.get("tool_name"):
-                msg["type"] = "tool_use"
-                msg["toolName"] = msg.get("tool_name")
-                msg["toolInput"] = msg.get("tool_input")
-            elif msg.get("role") == "assistant":
-                msg["type"] = "text"
-            messages.append(msg)
+        messages = [_transform_db_message(m) for m in db_messages]
 
     session["messages"] = messages
 
     logger.info(f"Returning session {session_id} with {len(messages)} messages")
     try:
-        return session
+        # Validate and encode to JSON bytes in one pydantic-core pass rather than
+        # FastAPI's validate -> jsonable dict -> json.dumps round trip. Output is
+        # identical to response_model, which is kept for the OpenAPI schema.
+        validated = SessionWithMessages.model_validate(session)
+        if message_format == "columnar":
+            data = validated.model_dump(mode="json")
+            data["messages"] = to_columnar(data["messages"], _MESSAGE_FIELDS)
+            body = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        else:
+            body = validated.model_dump_json()
     except Exception as e:
         logger.error(f"Failed to serialize session {session_id}: {e}\n{traceback.format_exc()}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to serialize session: {str(e)}"
         )
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
 
 @router.patch("/{session_id}")
 async def update_session(
-    request: Request,
     session_id: str,
     title: Optional[str] = None,
     session_status: Optional[str] = Query(None, alias="status"),
-    token: str = Depends(require_auth)
+    _: dict = Depends(require_session_access)
 ):
     """Update session title or status. API users can only modify their accessible sessions."""
-    existing = database.get_session(session_id)
-    if not existing:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Session not found: {session_id}"
-        )
-
-    check_session_access(request, existing)
-
-    session = database.update_session(
+    session = await asyncio.to_thread(
+        database.update_session,
         session_id=session_id,
         title=title,
         status=session_status
     )
+    invalidate_sessions_list_cache()
 
     return session
 
 
 @router.delete("/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_session(request: Request, session_id: str, token: str = Depends(require_auth)):
+async def delete_session(session_id: str, _: dict = Depends(require_session_access)):
     """Delete a session and its messages. API users can only delete their accessible sessions."""
-    existing = database.get_session(session_id)
-    if not existing:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Session not found: {session_id}"
-        )
-
-    check_session_access(request, existing)
-
-    database.delete_session(session_id)
+    await asyncio.to_thread(database.delete_session, session_id)
+    invalidate_sessions_list_cache()
 
 
 @router.post("/batch-delete", status_code=status.HTTP_200_OK)
@@ -271,23 +452,31 @@ async def batch_delete_sessions(
     API users can only delete sessions they have access to.
     Returns count of successfully deleted sessions.
     """
-    deleted_count = 0
     errors = []
+    allowed_ids = []
+
+    # One lookup for all requested sessions instead of a query per ID
+    by_id = {s["id"]: s for s in await asyncio.to_thread(database.get_sessions_by_ids, body.session_ids)}
+
+    # Resolve the caller once rather than per session
+    api_user = get_api_user_from_request(request)
 
     for session_id in body.session_ids:
+        existing = by_id.get(session_id)
+        if not existing:
+            errors.append(f"Session not found: {session_id}")
+        elif has_session_access(api_user, existing):
+            allowed_ids.append(session_id)
+        else:
+            errors.append(f"Access denied for session {session_id}: Access denied to this session")
+
+    deleted_count = 0
+    if allowed_ids:
         try:
-            existing = database.get_session(session_id)
-            if not existing:
-                errors.append(f"Session not found: {session_id}")
-                continue
-
-            check_session_access(request, existing)
-            database.delete_session(session_id)
-            deleted_count += 1
-        except HTTPException as e:
-            errors.append(f"Access denied for session {session_id}: {e.detail}")
+            deleted_count = await asyncio.to_thread(database.delete_sessions_bulk, allowed_ids)
+            invalidate_sessions_list_cache()
         except Exception as e:
-            errors.append(f"Error deleting session {session_id}: {str(e)}")
+            errors.append(f"Error deleting sessions: {str(e)}")
 
     return {
         "deleted_count": deleted_count,
@@ -297,35 +486,73 @@ async def batch_delete_sessions(
 
 
 @router.post("/{session_id}/archive")
-async def archive_session(request: Request, session_id: str, token: str = Depends(require_auth)):
+async def archive_session(session_id: str, _: dict = Depends(require_session_access)):
     """Archive a session. API users can only archive their accessible sessions."""
-    existing = database.get_session(session_id)
-    if not existing:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Session not found: {session_id}"
-        )
-
-    check_session_access(request, existing)
-
-    session = database.update_session(
+    session = await asyncio.to_thread(
+        database.update_session,
         session_id=session_id,
         status="archived"
     )
+    invalidate_sessions_list_cache()
 
     return {"status": "ok", "message": "Session archived"}
 
 
+@router.get("/{session_id}/messages")
+async def get_session_messages(
+    session_id: str,
+    before_id: Optional[int] = Query(None, description="Only messages older than this message ID"),
+    limit: int = Query(200, ge=1, le=1000),
+    content_preview: int = Query(1024, ge=0, description="Truncate content to this many characters (0 = full content)"),
+    _: dict = Depends(require_session_access)
+):
+    """
+    Page through a session's stored messages, newest window first.
+
+    Returns messages oldest-first plus has_more; pass the first message's id as
+    before_id to load the previous page. Truncated messages have content_truncated set.
+    """
+    messages, has_more = await asyncio.to_thread(
+        database.get_session_messages_page,
+        session_id,
+        limit=limit,
+        before_id=before_id,
+        content_preview=content_preview or None
+    )
+    return {
+        "messages": [_transform_db_message(m) for m in messages],
+        "has_more": has_more
+    }
+
+
 # ============================================================================
 # Sync endpoints for cross-device synchronization (polling fallback)
 # ============================================================================
 
+# In-flight /sync reads keyed by (session_id, since_id). Devices polling the same
+# session at the same position share one DB read instead of each running it.
+_inflight_sync_reads: Dict[Tuple[str, int], asyncio.Task] = {}
+
+
+async def _read_sync_changes(session_id: str, since_id: int) -> Tuple[list, int]:
+    """Single-flight wrapper around database.get_sync_logs_with_latest"""
+    key = (session_id, since_id)
+    task = _inflight_sync_reads.get(key)
+    if task is None:
+        task = asyncio.create_task(asyncio.to_thread(
+            database.get_sync_logs_with_latest, session_id, since_id=since_id
+        ))
+        _inflight_sync_reads[key] = task
+        task.add_done_callback(lambda _: _inflight_sync_reads.pop(key, None))
+    # Shield so one poller disconnecting doesn't cancel the read for the others
+    return await asyncio.shield(task)
+
+
 @router.get("/{session_id}/sync")
 async def get_sync_changes(
-    request: Request,
     session_id: str,
     since_id: int = Query(0, description="Get changes after this sync ID"),
-    token: str = Depends(require_auth)
+    _: dict = Depends(require_session_access)
 ):
     """
     Get sync changes for a session since a specific sync ID.
@@ -336,17 +563,7 @@ async def get_sync_changes(
         - latest_id: The most recent sync ID (use for next poll)
         - is_streaming: Whether the session is currently streaming
     """
-    existing = database.get_session(session_id)
-    if not existing:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Session not found: {session_id}"
-        )
-
-    check_session_access(request, existing)
-
-    changes = database.get_sync_logs(session_id, since_id=since_id)
-    latest_id = database.get_latest_sync_id(session_id)
+    changes, latest_id = await _read_sync_changes(session_id, since_id)
 
     # Check if streaming (import here to avoid circular import)
     from app.core.sync_engine import sync_engine
@@ -364,7 +581,11 @@ async def get_sync_changes(
 async def get_session_state(
     request: Request,
     session_id: str,
-    token: str = Depends(require_auth)
+    message_format: str = Query(
+        "rows", alias="format", pattern="^(rows|columnar)$",
+        description="'columnar' returns streaming_messages as parallel arrays"
+    ),
+    session: dict = Depends(require_session_access)
 ):
     """
     Get current session state for client reconnection.
@@ -378,27 +599,30 @@ async def get_session_state(
         - status: Session status (active, archived, etc.)
         - is_streaming: Whether work is currently in progress
         - connected_devices: Number of devices watching this session
-        - streaming_messages: Buffered messages if streaming (for late-joiners)
+        - streaming_messages: Buffered messages if streaming (for late-joiners),
+          as parallel arrays when format=columnar
     """
-    session = database.get_session(session_id)
-    if not session:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Session not found: {session_id}"
-        )
-
-    check_session_access(request, session)
-
     # Get current streaming state from SyncEngine
     from app.core.sync_engine import sync_engine
     sync_state = await sync_engine.get_session_state(session_id)
 
+    streaming_messages = sync_state.get("streaming_messages", [])
+    if message_format == "columnar":
+        streaming_messages = to_columnar(streaming_messages)
+
     # Combine session metadata with streaming state
-    return {
+    body = json.dumps(jsonable_encoder({
         "session_id": session_id,
         "title": session.get("title"),
         "status": session.get("status"),
         "is_streaming": sync_state["is_streaming"],
         "connected_devices": sync_state["connected_devices"],
-        "streaming_messages": sync_state.get("streaming_messages", [])
-    }
+        "streaming_messages": streaming_messages
+    }), ensure_ascii=False, separators=(",", ":"))
+
+    # State is cheap to build but the buffered messages can be large, so let
+    # reconnecting clients skip re-downloading an unchanged snapshot
+    etag = f'W/"{hashlib.sha1(body.encode()).hexdigest()}"'
+    if _etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
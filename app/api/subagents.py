@@ -8,6 +8,7 @@ from datetime import datetime
 from fastapi import APIRouter, HTTPException, Depends, status
 from pydantic import BaseModel, Field
 
+from app.core.models import SLUG_ID_PATTERN
 from app.db import database
 from app.api.auth import require_auth, require_admin
 
@@ -33,7 +34,7 @@ class SubagentResponse(BaseModel):
 
 class SubagentCreateRequest(BaseModel):
     """Request to create a new subagent"""
-    id: str = Field(..., pattern=r'^[a-z0-9-]+$', min_length=1, max_length=50)
+    id: str = Field(..., pattern=SLUG_ID_PATTERN, min_length=1, max_length=50)
     name: str = Field(..., min_length=1, max_length=100)
     description: str = Field(..., min_length=1)
     prompt: str = Field(..., min_length=1)
@@ -57,21 +58,9 @@ class SubagentUpdateRequest(BaseModel):
 @router.get("", response_model=List[SubagentResponse])
 async def list_subagents(token: str = Depends(require_auth)):
     """List all global subagents"""
-    subagents = database.get_all_subagents()
-    return [
-        SubagentResponse(
-            id=s["id"],
-            name=s["name"],
-            description=s["description"],
-            prompt=s["prompt"],
-            tools=s.get("tools"),
-            model=s.get("model"),
-            is_builtin=s.get("is_builtin", False),
-            created_at=s["created_at"],
-            updated_at=s["updated_at"]
-        )
-        for s in subagents
-    ]
+    # Rows go straight to response_model, which validates them once; building
+    # SubagentResponse here as well validated every row twice
+    return database.get_all_subagents()
 
 
 @router.get("/{subagent_id}", response_model=SubagentResponse)
@@ -84,17 +73,7 @@ async def get_subagent(subagent_id: str, token: str = Depends(require_auth)):
             detail=f"Subagent not found: {subagent_id}"
         )
 
-    return SubagentResponse(
-        id=subagent["id"],
-        name=subagent["name"],
-        description=subagent["description"],
-        prompt=subagent["prompt"],
-        tools=subagent.get("tools"),
-        model=subagent.get("model"),
-        is_builtin=subagent.get("is_builtin", False),
-        created_at=subagent["created_at"],
-        updated_at=subagent["updated_at"]
-    )
+    return subagent
 
 
 @router.post("", response_model=SubagentResponse, status_code=status.HTTP_201_CREATED)
@@ -118,17 +97,7 @@ async def create_subagent(request: SubagentCreateRequest, token: str = Depends(r
         is_builtin=False
     )
 
-    return SubagentResponse(
-        id=subagent["id"],
-        name=subagent["name"],
-        description=subagent["description"],
-        prompt=subagent["prompt"],
-        tools=subagent.get("tools"),
-        model=subagent.get("model"),
-        is_builtin=subagent.get("is_builtin", False),
-        created_at=subagent["created_at"],
-        updated_at=subagent["updated_at"]
-    )
+    return subagent
 
 
 @router.put("/{subagent_id}", response_model=SubagentResponse)
@@ -154,17 +123,7 @@ async def update_subagent(
         model=request.model
     )
 
-    return SubagentResponse(
-        id=subagent["id"],
-        name=subagent["name"],
-        description=subagent["description"],
-        prompt=subagent["prompt"],
-        tools=subagent.get("tools"),
-        model=subagent.get("model"),
-        is_builtin=subagent.get("is_builtin", False),
-        created_at=subagent["created_at"],
-        updated_at=subagent["updated_at"]
-    )
+    return subagent
 
 
 @router.delete("/{subagent_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -2,6 +2,7 @@
 System API routes - health, version, stats
 """
 
+import asyncio
 import subprocess
 from typing import Optional
 
@@ -35,11 +36,13 @@ async def api_health_check():
     return await health_check()
 
 
-@router.get("/api/v1/version", response_model=VersionResponse)
-async def get_version():
-    """Get API and Claude Code versions"""
-    claude_version = None
+# `claude --version` output, probed once at startup (see refresh_claude_version)
+_claude_version: Optional[str] = None
+_claude_version_probed = False
 
+
+def probe_claude_version() -> Optional[str]:
+    """Run `claude --version` and return its output, or None if unavailable"""
     try:
         result = subprocess.run(
             ['claude', '--version'],
@@ -48,9 +51,24 @@ async def get_version():
             timeout=5
         )
         if result.returncode == 0:
-            claude_version = result.stdout.strip()
+            return result.stdout.strip()
     except Exception:
         pass
+    return None
+
+
+async def refresh_claude_version() -> Optional[str]:
+    """Re-probe the Claude CLI version off the event loop and cache it"""
+    global _claude_version, _claude_version_probed
+    _claude_version = await asyncio.to_thread(probe_claude_version)
+    _claude_version_probed = True
+    return _claude_version
+
+
+@router.get("/api/v1/version", response_model=VersionResponse)
+async def get_version():
+    """Get API and Claude Code versions"""
+    claude_version = _claude_version if _claude_version_probed else await refresh_claude_version()
 
     return {
         "api_version": settings.version,
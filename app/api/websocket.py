@@ -11,19 +11,26 @@ Additional endpoints:
 """
 
 import logging
-import json
 import asyncio
+import sys
 import uuid
-from typing import Optional, Dict, Any
+import weakref
+from collections import deque
+from typing import Optional, Dict, Any, Deque, List, Union
 from datetime import datetime
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query, HTTPException, status
 from fastapi.websockets import WebSocketState
 
+from app.core.config import settings
+from app.core.json_codec import dumps as _dumps, loads as _loads
 from app.core.sync_engine import sync_engine, SyncEvent
 from app.db import database
 from app.core.auth import auth_service
+from app.api.auth import hash_api_key, ws_auth_cache, ws_auth_reject_cache
 from app.core.profiles import get_profile
+from app.core.query_engine import stream_to_websocket, interrupt_session
+from app.core.jsonl_parser import parse_session_history
 from app.core.cli_bridge import CLIBridge, RewindParser
 from app.core.slash_commands import (
     discover_commands, get_command_by_name, is_slash_command,
@@ -36,10 +43,83 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1", tags=["WebSocket"])
 
+
+async def send_ws_json(websocket: WebSocket, data: Any) -> None:
+    """Send data as a JSON text frame (browser clients JSON.parse text frames)"""
+    await websocket.send_text(_dumps(data))
+
+
+async def receive_ws_json(websocket: WebSocket) -> Any:
+    """Receive a JSON text frame, raising WebSocketDisconnect on close"""
+    return _loads(await websocket.receive_text())
+
+
+def _merge_stream_deltas(events: List[dict]) -> List[dict]:
+    """Fold adjacent stream_delta events for the same content block into one"""
+    merged: List[dict] = []
+    for event in events:
+        prev = merged[-1] if merged else None
+        if (
+            prev is not None
+            and event.get("type") == "stream_delta"
+            and prev.get("type") == "stream_delta"
+            and event.get("delta_type") == prev.get("delta_type")
+            and event.get("index") == prev.get("index")
+        ):
+            # Copy rather than mutate - run_query still reads the original event
+            merged[-1] = {**prev, "content": prev.get("content", "") + event.get("content", "")}
+        else:
+            merged.append(event)
+    return merged
+
+
+# WebSocketState members are singletons, so connection checks compare by
+# identity against this alias rather than going through Enum equality
+_CONNECTED = WebSocketState.CONNECTED
+
 # Track active chat sessions for interruption
 _active_chat_sessions: dict[str, asyncio.Task] = {}
 
 
+# Sentinel for a token that failed every auth check (None means admin)
+_AUTH_FAILED = object()
+
+
+def _query_ws_token(token: str, allow_api_key: bool) -> Any:
+    """DB lookup behind _lookup_ws_token (run in a worker thread)"""
+    # Admin session, API key web session and raw API key in one query
+    is_valid, api_user = database.resolve_access_token(
+        token, hash_api_key(token) if allow_api_key else None
+    )
+    return api_user if is_valid else _AUTH_FAILED
+
+
+async def _lookup_ws_token(token: str, allow_api_key: bool) -> Any:
+    """
+    Resolve a WebSocket token to its api_user (None for admin sessions), or
+    _AUTH_FAILED. Successful lookups are cached in ws_auth_cache and failed
+    ones, for a few seconds, in ws_auth_reject_cache.
+    """
+    cache_key = (token, allow_api_key)
+    cached = ws_auth_cache.get(cache_key, _AUTH_FAILED)
+    if cached is not _AUTH_FAILED:
+        return cached
+    if ws_auth_reject_cache.get(cache_key):
+        return _AUTH_FAILED
+
+    # Reject unknown tokens from memory so probing doesn't cost DB queries
+    if not database.token_may_be_valid(token):
+        return _AUTH_FAILED
+
+    result = await asyncio.to_thread(_query_ws_token, token, allow_api_key)
+
+    if result is not _AUTH_FAILED:
+        ws_auth_cache.set(cache_key, result)
+    else:
+        ws_auth_reject_cache.set(cache_key, True)
+    return result
+
+
 async def authenticate_websocket(websocket: WebSocket, token: Optional[str]) -> tuple[bool, Optional[dict]]:
     """
     Validate authentication token for WebSocket connection.
@@ -50,46 +130,52 @@ async def authenticate_websocket(websocket: WebSocket, token: Optional[str]) ->
         - For API user sessions: (True, api_user_dict)
         - For failed auth: (False, None)
     """
-    import hashlib
-
     # First try the token from query parameter
     if token:
-        # Check admin session token
-        session = database.get_auth_session(token)
-        if session:
-            return (True, None)  # Admin user
-
-        # Check API key web session token
-        api_key_session = database.get_api_key_session(token)
-        if api_key_session:
-            api_user = database.get_api_user(api_key_session["api_user_id"])
-            if api_user and api_user.get("is_active", True):
-                return (True, api_user)
-
-        # Check raw API key (hashed)
-        key_hash = hashlib.sha256(token.encode()).hexdigest()
-        api_user = database.get_api_user_by_key_hash(key_hash)
-        if api_user and api_user.get("is_active", True):
+        api_user = await _lookup_ws_token(token, allow_api_key=True)
+        if api_user is not _AUTH_FAILED:
             return (True, api_user)
 
     # Also check the cookie directly (for httpOnly cookies that JS can't read)
     cookie_token = websocket.cookies.get("session")
     if cookie_token:
-        # Check admin session
-        session = database.get_auth_session(cookie_token)
-        if session:
-            return (True, None)  # Admin user
-
-        # Check API key web session
-        api_key_session = database.get_api_key_session(cookie_token)
-        if api_key_session:
-            api_user = database.get_api_user(api_key_session["api_user_id"])
-            if api_user and api_user.get("is_active", True):
-                return (True, api_user)
+        api_user = await _lookup_ws_token(cookie_token, allow_api_key=False)
+        if api_user is not _AUTH_FAILED:
+            return (True, api_user)
 
     return (False, None)
 
 
+def _session_working_dir(project_path: Optional[str]) -> str:
+    """Working directory for a session whose project has the given path"""
+    if project_path:
+        return str(settings.workspace_dir / project_path)
+    return "/workspace"
+
+
+# Streaming message type for each legacy DB role (tool_name rows are always tool_use)
+_DB_ROLE_TYPES = {"assistant": "text", "tool_use": "tool_use", "tool_result": "tool_result"}
+_DB_TOOL_ROLES = frozenset({"tool_use", "tool_result"})
+
+
+def _db_messages_to_stream_format(db_messages: list) -> list:
+    """Transform session_messages rows into the streaming message format"""
+    return [
+        {
+            "id": f"msg-{m['id']}",
+            "role": "assistant" if m["role"] in _DB_TOOL_ROLES else m["role"],
+            "content": m["content"],
+            "type": "tool_use" if m["tool_name"] else _DB_ROLE_TYPES.get(m["role"]),
+            "toolName": m["tool_name"],
+            "toolId": m.get("tool_id"),  # Not a session_messages column
+            "toolInput": m["tool_input"],
+            "metadata": m["metadata"],
+            "streaming": False
+        }
+        for m in db_messages
+    ]
+
+
 # =============================================================================
 # PRIMARY CHAT WEBSOCKET - Simple, reliable streaming
 # =============================================================================
@@ -113,6 +199,9 @@ async def chat_websocket(
     Message types FROM server:
     - history: Full message history for session (on connect or session switch)
       - Includes isStreaming and streamingBuffer for late-joining devices
+    - history_start / history_chunk / history_end: Long histories in pieces;
+      history_start carries everything history does except messages, each
+      history_chunk carries the next slice of messages
     - start: Query started, streaming will begin
     - chunk: Text content chunk
     - stream_delta: Real-time streaming delta (when include_partial_messages=True)
@@ -121,6 +210,8 @@ async def chat_websocket(
     - done: Query complete with metadata
     - error: Error occurred
     - ping: Keep-alive
+    - batch: {"type": "batch", "events": [...]} - several of the above coalesced
+      into one frame; handle each event in order
     - Sync events (from SyncEngine for other devices):
       - stream_start: Another device started streaming
       - stream_chunk: Streaming chunk from another device
@@ -154,28 +245,79 @@ async def chat_websocket(
 
     # Generate device_id if not provided
     if not device_id:
-        device_id = str(uuid.uuid4())
+        device_id = uuid.uuid4().hex
         logger.info(f"Generated device_id: {device_id}")
 
     current_session_id: Optional[str] = None
     query_task: Optional[asyncio.Task] = None
 
-    async def send_json(data: dict):
-        """Safe JSON send with connection check"""
-        if websocket.client_state == WebSocketState.CONNECTED:
+    # Outbound events are queued and flushed by a single writer task, so a
+    # burst of stream deltas goes out as one "batch" frame instead of one
+    # frame (and one transport drain) per token. The queue is bounded: when a
+    # slow client lets it fill up, senders wait, which backpressures the query
+    # stream instead of buffering without limit.
+    out_queue: asyncio.Queue = asyncio.Queue(maxsize=settings.ws_send_queue_size)
+    # Set once the socket fails or the connection ends; checked instead of
+    # reading websocket.client_state on every streamed event
+    writer_closed = False
+
+    async def send_json(data: Union[dict, str]):
+        """
+        Queue a message for the connection's writer task. Already-encoded
+        JSON strings are sent as their own frame instead of being batched.
+        """
+        if writer_closed:
+            return
+        try:
+            out_queue.put_nowait(data)
+        except asyncio.QueueFull:
+            # Events are never dropped - a gap in stream deltas would corrupt
+            # the message on the client - so wait for the writer to make room
+            await out_queue.put(data)
+
+    async def writer_loop():
+        """Drain the send queue, coalescing queued events into batch frames"""
+        nonlocal writer_closed
+        batch_window = settings.ws_batch_window_ms / 1000
+        batch_max = settings.ws_batch_max_events
+        pending = None
+        while True:
+            item = pending if pending is not None else await out_queue.get()
+            pending = None
+            if writer_closed:
+                continue  # Discard, but keep draining so blocked senders are released
+
+            if isinstance(item, str):
+                frame = item
+            else:
+                batch = [item]
+                if batch_window > 0 and out_queue.empty():
+                    await asyncio.sleep(batch_window)
+                while len(batch) < batch_max and not out_queue.empty():
+                    item = out_queue.get_nowait()
+                    if isinstance(item, str):
+                        # Pre-encoded frame goes out on its own after this batch
+                        pending = item
+                        break
+                    batch.append(item)
+                if len(batch) > 1:
+                    batch = _merge_stream_deltas(batch)
+                frame = _dumps(batch[0] if len(batch) == 1 else {"type": "batch", "events": batch})
+
             try:
-                await websocket.send_json(data)
+                await websocket.send_text(frame)
+                note_heartbeat_send(websocket)
             except Exception as e:
+                writer_closed = True
                 logger.warning(f"Failed to send WebSocket message: {e}")
 
     async def run_query(prompt: str, session_id: str, profile_id: str, project_id: Optional[str], overrides: Optional[Dict[str, Any]] = None):
         """Execute query and stream results directly to WebSocket"""
         nonlocal current_session_id
 
-        from app.core.query_engine import stream_to_websocket
-
-        # Generate a message ID for this streaming session
-        message_id = str(uuid.uuid4())
+        # Generate a message ID for this streaming session (opaque to clients,
+        # so the undashed hex form is fine)
+        message_id = uuid.uuid4().hex
         stream_started = False
 
         # Unregister this device from SyncEngine while streaming
@@ -189,6 +331,8 @@ async def chat_websocket(
             await send_json({"type": "start", "session_id": session_id, "message_id": message_id})
 
             logger.info(f"Calling stream_to_websocket for session {session_id}")
+            # Checked once, not per event - the stream loop runs for every token
+            debug_enabled = logger.isEnabledFor(logging.DEBUG)
             async for event in stream_to_websocket(
                 prompt=prompt,
                 session_id=session_id,
@@ -198,7 +342,8 @@ async def chat_websocket(
                 broadcast_func=send_json  # Pass send_json for permission requests
             ):
                 event_type = event.get('type')
-                logger.debug(f"Streaming event for session {session_id}: {event_type}")
+                if debug_enabled:
+                    logger.debug("Streaming event for session %s: %s", session_id, event_type)
 
                 # Send to this websocket
                 await send_json(event)
@@ -462,343 +607,373 @@ async def chat_websocket(
             # but ONLY if the websocket is still connected.
             # If the user disconnected during streaming (phone locked, etc.),
             # they will re-register when they reconnect via load_session.
-            if websocket.client_state == WebSocketState.CONNECTED:
+            if websocket.client_state is _CONNECTED:
                 await sync_engine.register_device(device_id, session_id, websocket)
                 logger.info(f"Re-registered device {device_id} after streaming complete")
             else:
                 logger.info(f"Skipping re-register for device {device_id} - websocket disconnected during streaming")
 
-            # Clean up task reference
-            if session_id in _active_chat_sessions:
+            # Clean up task reference - only if it is still ours, since a newer
+            # query for this session may already have replaced it
+            if _active_chat_sessions.get(session_id) is asyncio.current_task():
                 del _active_chat_sessions[session_id]
 
-    try:
-        # Start ping task
-        ping_task = asyncio.create_task(ping_loop(websocket, "chat"))
+    async def handle_query(data: dict):
+        """Start a new query"""
+        nonlocal current_session_id, query_task
+
+        prompt = data.get("prompt", "").strip()
+        session_id = data.get("session_id")
+        profile_id = data.get("profile", "claude-code")
+        project_id = data.get("project")
+        overrides = data.get("overrides")  # Optional: {model, permission_mode}
+
+        if not prompt:
+            await send_json({"type": "error", "message": "Empty prompt"})
+            return
+
+        # Create or get session
+        is_new_session = not session_id
+        if is_new_session:
+            # Create new session together with the user message (one transaction)
+            session_id = str(uuid.uuid4())
+            await asyncio.to_thread(
+                database.create_session_with_first_message,
+                session_id=session_id,
+                profile_id=profile_id,
+                role="user",
+                content=prompt,
+                project_id=project_id,
+                api_user_id=api_user_id
+            )
+            # Immediately notify frontend of new session_id so it persists on refresh
+            await send_json({
+                "type": "session_created",
+                "session_id": session_id
+            })
 
-        try:
-            while True:
-                try:
-                    data = await asyncio.wait_for(
-                        websocket.receive_json(),
-                        timeout=60.0
-                    )
+        # Register device with session if switching sessions
+        if session_id != current_session_id:
+            # Unregister from old session if any
+            if current_session_id:
+                await sync_engine.unregister_device(device_id, current_session_id)
 
-                    msg_type = data.get("type")
-
-                    if msg_type == "query":
-                        # Start a new query
-                        prompt = data.get("prompt", "").strip()
-                        session_id = data.get("session_id")
-                        profile_id = data.get("profile", "claude-code")
-                        project_id = data.get("project")
-                        overrides = data.get("overrides")  # Optional: {model, permission_mode}
-
-                        if not prompt:
-                            await send_json({"type": "error", "message": "Empty prompt"})
-                            continue
-
-                        # Create or get session
-                        if not session_id:
-                            # Create new session
-                            session_id = str(uuid.uuid4())
-                            database.create_session(
-                                session_id=session_id,
-                                profile_id=profile_id,
-                                project_id=project_id,
-                                api_user_id=api_user_id
-                            )
-                            # Immediately notify frontend of new session_id so it persists on refresh
-                            await send_json({
-                                "type": "session_created",
-                                "session_id": session_id
-                            })
-
-                        # Register device with session if switching sessions
-                        if session_id != current_session_id:
-                            # Unregister from old session if any
-                            if current_session_id:
-                                await sync_engine.unregister_device(device_id, current_session_id)
-
-                            # Register to new session
-                            await sync_engine.register_device(device_id, session_id, websocket)
-                            current_session_id = session_id
-
-                        # Store user message
-                        database.add_session_message(
-                            session_id=session_id,
-                            role="user",
-                            content=prompt
-                        )
+            # Register to new session
+            await sync_engine.register_device(device_id, session_id, websocket)
+            current_session_id = session_id
+
+        # Store user message (already stored for a new session)
+        if not is_new_session:
+            await asyncio.to_thread(
+                database.add_session_message,
+                session_id=session_id,
+                role="user",
+                content=prompt
+            )
+
+        # Broadcast user message to other devices
+        await sync_engine.broadcast_message_added(
+            session_id=session_id,
+            message={
+                "role": "user",
+                "content": prompt
+            },
+            source_device_id=device_id  # Exclude the sender
+        )
+
+        # Cancel any existing query for this session
+        existing_task = _active_chat_sessions.pop(session_id, None)
+        if existing_task and not existing_task.done():
+            existing_task.cancel("Replaced by a new query")
+            try:
+                await existing_task
+            except asyncio.CancelledError:
+                pass
+
+        # Start new query task
+        # Note: broadcast_stream_start is called inside run_query when actual
+        # streaming begins. This prevents stuck streaming state if query fails early.
+        query_task = asyncio.create_task(
+            run_query(prompt, session_id, profile_id, project_id, overrides)
+        )
+        _active_chat_sessions[session_id] = query_task
+
+    async def handle_stop(data: dict):
+        """Stop the current query"""
+        # Stop current query - use interrupt_session for proper SDK-level cancellation
+        session_id = data.get("session_id") or current_session_id
+        if session_id:
+            # First, try to interrupt at the SDK level (this signals Claude to stop)
+            interrupted = await interrupt_session(session_id)
+            logger.info(f"Interrupt session {session_id}: {interrupted}")
+
+            # Then cancel the asyncio task as a backup. It isn't awaited:
+            # run_query sends "stopped" and cleans up itself once the
+            # cancellation lands, and a following query on this session
+            # still waits for it in handle_query
+            task = _active_chat_sessions.get(session_id)
+            if task and not task.done():
+                task.cancel("Stopped by client")
+
+    async def handle_load_session(data: dict):
+        """Load a session's message history (JSONL first, DB fallback)"""
+        nonlocal current_session_id
 
-                        # Broadcast user message to other devices
-                        await sync_engine.broadcast_message_added(
+        session_id = data.get("session_id")
+        if session_id:
+            # Blocking DB and JSONL reads run in worker threads so a
+            # large history doesn't stall other connections
+            session, project_path = await asyncio.to_thread(
+                database.get_session_with_project_path, session_id
+            )
+            if session:
+                # Unregister from old session if switching
+                if current_session_id and current_session_id != session_id:
+                    await sync_engine.unregister_device(device_id, current_session_id)
+
+                # Register to new session
+                await sync_engine.register_device(device_id, session_id, websocket)
+                current_session_id = session_id
+
+                # Try to load from JSONL file first (source of truth)
+                sdk_session_id = session.get("sdk_session_id")
+                messages = []
+
+                if sdk_session_id:
+                    try:
+                        working_dir = _session_working_dir(project_path)
+                        messages = await asyncio.to_thread(parse_session_history, sdk_session_id, working_dir)
+                        logger.info(f"Loaded {len(messages)} messages from JSONL for session {session_id}")
+                    except Exception as e:
+                        logger.error(f"Failed to parse JSONL for session {session_id}: {e}")
+                        messages = []
+
+                # Fall back to database if JSONL not available or failed
+                if not messages:
+                    db_messages = await asyncio.to_thread(database.get_session_messages, session_id)
+                    messages = _db_messages_to_stream_format(db_messages)
+                    logger.info(f"Loaded {len(messages)} messages from DB for session {session_id}")
+
+                # Check if session is currently streaming (late-joining device)
+                is_streaming = sync_engine.is_session_streaming(session_id)
+                streaming_buffer = None
+                logger.info(f"Session {session_id} streaming status: {is_streaming}")
+
+                # Validate streaming state - if marked streaming but no active task, it's stale
+                if is_streaming:
+                    active_task = _active_chat_sessions.get(session_id)
+                    if active_task is None or active_task.done():
+                        # Stale streaming state - clean it up
+                        logger.warning(f"Session {session_id} marked as streaming but no active task - clearing stale state")
+                        await sync_engine.broadcast_stream_end(
                             session_id=session_id,
-                            message={
-                                "role": "user",
-                                "content": prompt
-                            },
-                            source_device_id=device_id  # Exclude the sender
+                            message_id="stale-cleanup",
+                            metadata={},
+                            interrupted=True,
+                            source_device_id=None
                         )
+                        is_streaming = False
+                    else:
+                        streaming_buffer = sync_engine.get_streaming_buffer(session_id)
+                        logger.info(f"Session {session_id} is streaming, sending buffer with {len(streaming_buffer) if streaming_buffer else 0} messages")
+
+                chunk_size = settings.ws_history_chunk_size
+                if len(messages) <= chunk_size:
+                    await send_json({
+                        "type": "history",
+                        "session_id": session_id,
+                        "session": session,
+                        "messages": messages,
+                        "isStreaming": is_streaming,
+                        "streamingBuffer": streaming_buffer
+                    })
+                else:
+                    # Long histories go out as history_start, history_chunk...,
+                    # history_end so no single frame holds the whole session.
+                    # Chunks are pre-encoded so the writer never re-batches them.
+                    await send_json({
+                        "type": "history_start",
+                        "session_id": session_id,
+                        "session": session,
+                        "count": len(messages),
+                        "isStreaming": is_streaming,
+                        "streamingBuffer": streaming_buffer
+                    })
+                    for offset in range(0, len(messages), chunk_size):
+                        await send_json(_dumps({
+                            "type": "history_chunk",
+                            "session_id": session_id,
+                            "offset": offset,
+                            "messages": messages[offset:offset + chunk_size]
+                        }))
+                        # Queueing only blocks when the send queue is full, so
+                        # yield after each encode to keep other connections
+                        # running while a long history is serialized
+                        await asyncio.sleep(0)
+                    await send_json({"type": "history_end", "session_id": session_id})
+
+                # Broadcast to other devices that this session was opened
+                await sync_engine.broadcast_session_opened(
+                    session_id=session_id,
+                    device_id=device_id,
+                    is_new=False  # Resuming existing session
+                )
+            else:
+                await send_json({"type": "error", "message": "Session not found"})
 
-                        # Cancel any existing query for this session
-                        if session_id in _active_chat_sessions:
-                            _active_chat_sessions[session_id].cancel()
-                            try:
-                                await _active_chat_sessions[session_id]
-                            except asyncio.CancelledError:
-                                pass
-
-                        # Start new query task
-                        # Note: broadcast_stream_start is called inside run_query when actual
-                        # streaming begins. This prevents stuck streaming state if query fails early.
-                        query_task = asyncio.create_task(
-                            run_query(prompt, session_id, profile_id, project_id, overrides)
-                        )
-                        _active_chat_sessions[session_id] = query_task
-
-                    elif msg_type == "stop":
-                        # Stop current query - use interrupt_session for proper SDK-level cancellation
-                        session_id = data.get("session_id") or current_session_id
-                        if session_id:
-                            from app.core.query_engine import interrupt_session
-                            # First, try to interrupt at the SDK level (this signals Claude to stop)
-                            interrupted = await interrupt_session(session_id)
-                            logger.info(f"Interrupt session {session_id}: {interrupted}")
-
-                            # Then cancel the asyncio task as a backup
-                            if session_id in _active_chat_sessions:
-                                task = _active_chat_sessions[session_id]
-                                if not task.done():
-                                    task.cancel()
-                                    try:
-                                        await asyncio.wait_for(task, timeout=2.0)
-                                    except (asyncio.CancelledError, asyncio.TimeoutError):
-                                        pass
-
-                    elif msg_type == "load_session":
-                        # Load a session's message history from JSONL file
-                        session_id = data.get("session_id")
-                        if session_id:
-                            session = database.get_session(session_id)
-                            if session:
-                                # Unregister from old session if switching
-                                if current_session_id and current_session_id != session_id:
-                                    await sync_engine.unregister_device(device_id, current_session_id)
-
-                                # Register to new session
-                                await sync_engine.register_device(device_id, session_id, websocket)
-                                current_session_id = session_id
-
-                                # Try to load from JSONL file first (source of truth)
-                                sdk_session_id = session.get("sdk_session_id")
-                                messages = []
-
-                                if sdk_session_id:
-                                    try:
-                                        from app.core.jsonl_parser import parse_session_history
-                                        # Get working dir from project if available
-                                        working_dir = "/workspace"
-                                        project_id = session.get("project_id")
-                                        if project_id:
-                                            project = database.get_project(project_id)
-                                            if project:
-                                                from app.core.config import settings
-                                                working_dir = str(settings.workspace_dir / project["path"])
-
-                                        messages = parse_session_history(sdk_session_id, working_dir)
-                                        logger.info(f"Loaded {len(messages)} messages from JSONL for session {session_id}")
-                                    except Exception as e:
-                                        logger.error(f"Failed to parse JSONL for session {session_id}: {e}")
-                                        messages = []
-
-                                # Fall back to database if JSONL not available or failed
-                                if not messages:
-                                    db_messages = database.get_session_messages(session_id)
-                                    # Transform DB messages to streaming format
-                                    for m in db_messages:
-                                        msg_type_value = None
-                                        if m.get("tool_name"):
-                                            msg_type_value = "tool_use"
-                                        elif m.get("role") == "assistant":
-                                            msg_type_value = "text"
-                                        elif m.get("role") in ("tool_use", "tool_result"):
-                                            msg_type_value = m.get("role")
-
-                                        messages.append({
-                                            "id": f"msg-{m.get('id', 0)}",
-                                            "role": "assistant" if m.get("role") in ("tool_use", "tool_result") else m.get("role"),
-                                            "content": m.get("content", ""),
-                                            "type": msg_type_value,
-                                            "toolName": m.get("tool_name"),
-                                            "toolId": m.get("tool_id"),
-                                            "toolInput": m.get("tool_input"),
-                                            "metadata": m.get("metadata"),
-                                            "streaming": False
-                                        })
-                                    logger.info(f"Loaded {len(messages)} messages from DB for session {session_id}")
-
-                                # Check if session is currently streaming (late-joining device)
-                                is_streaming = sync_engine.is_session_streaming(session_id)
-                                streaming_buffer = None
-                                logger.info(f"Session {session_id} streaming status: {is_streaming}")
-
-                                # Validate streaming state - if marked streaming but no active task, it's stale
-                                if is_streaming:
-                                    active_task = _active_chat_sessions.get(session_id)
-                                    if active_task is None or active_task.done():
-                                        # Stale streaming state - clean it up
-                                        logger.warning(f"Session {session_id} marked as streaming but no active task - clearing stale state")
-                                        await sync_engine.broadcast_stream_end(
-                                            session_id=session_id,
-                                            message_id="stale-cleanup",
-                                            metadata={},
-                                            interrupted=True,
-                                            source_device_id=None
-                                        )
-                                        is_streaming = False
-                                    else:
-                                        streaming_buffer = sync_engine.get_streaming_buffer(session_id)
-                                        logger.info(f"Session {session_id} is streaming, sending buffer with {len(streaming_buffer) if streaming_buffer else 0} messages")
-
-                                await send_json({
-                                    "type": "history",
-                                    "session_id": session_id,
-                                    "session": session,
-                                    "messages": messages,
-                                    "isStreaming": is_streaming,
-                                    "streamingBuffer": streaming_buffer
-                                })
-
-                                # Broadcast to other devices that this session was opened
-                                await sync_engine.broadcast_session_opened(
-                                    session_id=session_id,
-                                    device_id=device_id,
-                                    is_new=False  # Resuming existing session
-                                )
-                            else:
-                                await send_json({"type": "error", "message": "Session not found"})
-
-                    elif msg_type == "close_session":
-                        # Close/unload the current session
-                        old_session_id = current_session_id
-                        if old_session_id:
-                            await sync_engine.unregister_device(device_id, old_session_id)
-                            # Broadcast to other devices that this session was closed
-                            await sync_engine.broadcast_session_closed(
-                                session_id=old_session_id,
-                                device_id=device_id
-                            )
-                            current_session_id = None
-                            logger.info(f"Device {device_id} closed session {old_session_id}")
-                            await send_json({"type": "session_closed", "session_id": old_session_id})
-
-                    elif msg_type == "permission_response":
-                        # Handle permission response from frontend
-                        request_id = data.get("request_id")
-                        decision = data.get("decision")  # "allow" or "deny"
-                        remember = data.get("remember")  # "none", "session", or "profile"
-                        pattern = data.get("pattern")  # Optional pattern for the rule
-
-                        if request_id and decision and current_session_id:
-                            result = await permission_handler.respond(
-                                request_id=request_id,
-                                session_id=current_session_id,
-                                decision=decision,
-                                remember=remember,
-                                pattern=pattern,
-                                broadcast_func=send_json
-                            )
-                            logger.info(f"Permission response processed: {result}")
-
-                            # Send confirmation back
-                            await send_json({
-                                "type": "permission_response_ack",
-                                "request_id": request_id,
-                                "result": result
-                            })
-                        else:
-                            await send_json({
-                                "type": "error",
-                                "message": "Invalid permission response"
-                            })
-
-                    elif msg_type == "get_pending_permissions":
-                        # Get pending permission requests for current session
-                        if current_session_id:
-                            pending = permission_handler.get_pending_requests(current_session_id)
-                            await send_json({
-                                "type": "pending_permissions",
-                                "session_id": current_session_id,
-                                "requests": pending
-                            })
-
-                    elif msg_type == "user_question_response":
-                        # Handle user question response from frontend
-                        request_id = data.get("request_id")
-                        answers = data.get("answers", {})
-
-                        if current_session_id and request_id and answers:
-                            result = await user_question_handler.respond(
-                                request_id=request_id,
-                                session_id=current_session_id,
-                                answers=answers
-                            )
-                            logger.info(f"User question response processed: {request_id} -> {result}")
-
-                            await send_json({
-                                "type": "user_question_response_ack",
-                                "request_id": request_id,
-                                "success": result
-                            })
-                        else:
-                            await send_json({
-                                "type": "error",
-                                "message": "Invalid user question response"
-                            })
-
-                    elif msg_type == "get_pending_questions":
-                        # Get pending user questions for current session
-                        if current_session_id:
-                            pending = user_question_handler.get_pending_questions(current_session_id)
-                            await send_json({
-                                "type": "pending_questions",
-                                "session_id": current_session_id,
-                                "questions": pending
-                            })
-
-                    elif msg_type == "pong":
-                        pass  # Keep-alive response
-
-                except asyncio.TimeoutError:
-                    if websocket.client_state != WebSocketState.CONNECTED:
-                        break
-                    continue
+    async def handle_close_session(data: dict):
+        """Close/unload the current session"""
+        nonlocal current_session_id
 
-        finally:
-            ping_task.cancel()
-            try:
-                await ping_task
-            except asyncio.CancelledError:
-                pass
+        old_session_id = current_session_id
+        if old_session_id:
+            await sync_engine.unregister_device(device_id, old_session_id)
+            # Broadcast to other devices that this session was closed
+            await sync_engine.broadcast_session_closed(
+                session_id=old_session_id,
+                device_id=device_id
+            )
+            current_session_id = None
+            logger.info(f"Device {device_id} closed session {old_session_id}")
+            await send_json({"type": "session_closed", "session_id": old_session_id})
+
+    async def handle_permission_response(data: dict):
+        """Handle permission response from frontend"""
+        request_id = data.get("request_id")
+        decision = data.get("decision")  # "allow" or "deny"
+        remember = data.get("remember")  # "none", "session", or "profile"
+        pattern = data.get("pattern")  # Optional pattern for the rule
+
+        if request_id and decision and current_session_id:
+            result = await permission_handler.respond(
+                request_id=request_id,
+                session_id=current_session_id,
+                decision=decision,
+                remember=remember,
+                pattern=pattern,
+                broadcast_func=send_json
+            )
+            logger.info(f"Permission response processed: {result}")
+
+            # Send confirmation back
+            await send_json({
+                "type": "permission_response_ack",
+                "request_id": request_id,
+                "result": result
+            })
+        else:
+            await send_json({
+                "type": "error",
+                "message": "Invalid permission response"
+            })
 
-            # NOTE: We intentionally do NOT cancel the query task when the websocket closes.
-            # This allows streaming to continue for other devices even if the originating
-            # device disconnects (e.g., page refresh, phone locked, network issue).
-            # The query will complete naturally and broadcast stream_end to all devices.
-            # If the user wants to stop the query, they should use the "stop" message explicitly.
-            if query_task and not query_task.done():
-                logger.info(f"WebSocket closed but query task still running for session - letting it continue for other devices")
-
-            # Unregister device from sync engine, but only if still using this websocket
-            # This prevents race conditions where a new connection was established
-            # before this cleanup runs (e.g., page reload during streaming)
-            if current_session_id:
-                await sync_engine.unregister_device(device_id, current_session_id, websocket)
-                logger.info(f"Cleanup: unregister device {device_id} from session {current_session_id}")
+    async def handle_get_pending_permissions(data: dict):
+        """Get pending permission requests for current session"""
+        if current_session_id:
+            pending = permission_handler.get_pending_requests(current_session_id)
+            await send_json({
+                "type": "pending_permissions",
+                "session_id": current_session_id,
+                "requests": pending
+            })
 
-    except WebSocketDisconnect:
-        logger.info("Chat WebSocket disconnected")
+    async def handle_user_question_response(data: dict):
+        """Handle user question response from frontend"""
+        request_id = data.get("request_id")
+        answers = data.get("answers", {})
+
+        if current_session_id and request_id and answers:
+            result = await user_question_handler.respond(
+                request_id=request_id,
+                session_id=current_session_id,
+                answers=answers
+            )
+            logger.info(f"User question response processed: {request_id} -> {result}")
+
+            await send_json({
+                "type": "user_question_response_ack",
+                "request_id": request_id,
+                "success": result
+            })
+        else:
+            await send_json({
+                "type": "error",
+                "message": "Invalid user question response"
+            })
+
+    async def handle_get_pending_questions(data: dict):
+        """Get pending user questions for current session"""
+        if current_session_id:
+            pending = user_question_handler.get_pending_questions(current_session_id)
+            await send_json({
+                "type": "pending_questions",
+                "session_id": current_session_id,
+                "questions": pending
+            })
+
+    # Client message type -> handler ("pong" and unknown types are ignored)
+    message_handlers = {
+        "query": handle_query,
+        "stop": handle_stop,
+        "load_session": handle_load_session,
+        "close_session": handle_close_session,
+        "permission_response": handle_permission_response,
+        "get_pending_permissions": handle_get_pending_permissions,
+        "user_question_response": handle_user_question_response,
+        "get_pending_questions": handle_get_pending_questions
+    }
+
+    try:
+        # Connection-scoped tasks run in a TaskGroup: if the writer fails, the
+        # receive loop is cancelled with it, and leaving the loop cancels the
+        # writer. Query tasks are deliberately not in the group - they outlive
+        # the socket so other devices still get the rest of the stream.
+        async with asyncio.TaskGroup() as tg:
+            writer_task = tg.create_task(writer_loop())
+            start_heartbeat(websocket)
+
+            try:
+                while True:
+                    try:
+                        # asyncio.timeout avoids wrapping every receive in a new Task
+                        async with asyncio.timeout(60.0):
+                            data = await receive_ws_json(websocket)
+
+                        handler = message_handlers.get(data.get("type"))
+                        if handler:
+                            await handler(data)
+
+                    except asyncio.TimeoutError:
+                        if websocket.client_state is not _CONNECTED:
+                            break
+                        continue
+
+            except WebSocketDisconnect:
+                # Handled inside the group so it isn't re-raised as an ExceptionGroup
+                logger.info("Chat WebSocket disconnected")
+
+            finally:
+                stop_heartbeat(websocket)
+                writer_task.cancel()
+                # Stop accepting events and release any query task blocked on a full queue
+                writer_closed = True
+                while not out_queue.empty():
+                    out_queue.get_nowait()
+
+                # NOTE: We intentionally do NOT cancel the query task when the websocket closes.
+                # This allows streaming to continue for other devices even if the originating
+                # device disconnects (e.g., page refresh, phone locked, network issue).
+                # The query will complete naturally and broadcast stream_end to all devices.
+                # If the user wants to stop the query, they should use the "stop" message explicitly.
+                if query_task and not query_task.done():
+                    logger.info(f"WebSocket closed but query task still running for session - letting it continue for other devices")
+
+                # Unregister device from sync engine, but only if still using this websocket
+                # This prevents race conditions where a new connection was established
+                # before this cleanup runs (e.g., page reload during streaming)
+                if current_session_id:
+                    await sync_engine.unregister_device(device_id, current_session_id, websocket)
+                    logger.info(f"Cleanup: unregister device {device_id} from session {current_session_id}")
 
     except Exception as e:
         logger.error(f"Chat WebSocket error: {e}")
@@ -846,7 +1021,7 @@ async def session_sync_websocket(
         return
 
     # Verify session exists
-    session = database.get_session(session_id)
+    session = await asyncio.to_thread(database.get_session, session_id)
     if not session:
         await websocket.close(code=4004, reason="Session not found")
         return
@@ -866,9 +1041,12 @@ async def session_sync_websocket(
         # Send initial state
         state = await sync_engine.get_session_state(session_id)
         state["session"] = session
-        state["messages"] = database.get_session_messages(session_id)
+        # Recent window only; older history via GET /sessions/{id}/messages?before_id=
+        state["messages"], state["messages_has_more"] = await asyncio.to_thread(
+            database.get_session_messages_page, session_id
+        )
 
-        await websocket.send_json({
+        await send_ws_json(websocket, {
             "event_type": "state",
             "session_id": session_id,
             "data": state,
@@ -876,48 +1054,38 @@ async def session_sync_websocket(
         })
 
         # Keep connection alive and handle client messages
-        ping_task = asyncio.create_task(ping_loop(websocket, device_id))
+        start_heartbeat(websocket, idle_timeout=True)
 
         try:
             while True:
-                try:
-                    # Wait for messages from client
-                    data = await asyncio.wait_for(
-                        websocket.receive_json(),
-                        timeout=60.0  # 60 second timeout
-                    )
+                # Wait for messages from client - dead peers are closed by the
+                # heartbeat's idle timeout, so no per-receive timer is needed
+                data = await receive_ws_json(websocket)
+                touch_heartbeat(websocket)
 
-                    # Handle client messages
-                    msg_type = data.get("type")
-
-                    if msg_type == "pong":
-                        # Client responding to ping - connection is alive
-                        connection.last_activity = connection.connected_at.__class__.utcnow()
+                # Handle client messages
+                msg_type = data.get("type")
 
-                    elif msg_type == "request_state":
-                        # Client requesting current state
-                        state = await sync_engine.get_session_state(session_id)
-                        state["session"] = database.get_session(session_id)
-                        state["messages"] = database.get_session_messages(session_id)
-                        await websocket.send_json({
-                            "event_type": "state",
-                            "session_id": session_id,
-                            "data": state,
-                            "timestamp": None
-                        })
+                if msg_type == "pong":
+                    # Client responding to ping - connection is alive
+                    connection.last_activity = connection.connected_at.__class__.utcnow()
 
-                except asyncio.TimeoutError:
-                    # No message received, check if connection is still alive
-                    if websocket.client_state != WebSocketState.CONNECTED:
-                        break
-                    continue
+                elif msg_type == "request_state":
+                    # Client requesting current state
+                    state = await sync_engine.get_session_state(session_id)
+                    state["session"] = await asyncio.to_thread(database.get_session, session_id)
+                    state["messages"], state["messages_has_more"] = await asyncio.to_thread(
+                        database.get_session_messages_page, session_id
+                    )
+                    await send_ws_json(websocket, {
+                        "event_type": "state",
+                        "session_id": session_id,
+                        "data": state,
+                        "timestamp": None
+                    })
 
         finally:
-            ping_task.cancel()
-            try:
-                await ping_task
-            except asyncio.CancelledError:
-                pass
+            stop_heartbeat(websocket)
 
     except WebSocketDisconnect:
         logger.info(f"WebSocket disconnected: device={device_id}, session={session_id}")
@@ -930,25 +1098,81 @@ async def session_sync_websocket(
         await sync_engine.unregister_device(device_id, session_id)
 
 
-async def ping_loop(websocket: WebSocket, device_id: str):
-    """Send periodic pings to keep connection alive"""
-    try:
-        while True:
-            await asyncio.sleep(30)  # Ping every 30 seconds
+# One process-wide keep-alive task pings every registered socket, instead of
+# a sleeping ping task (and timer) per connection
+HEARTBEAT_INTERVAL = 30  # seconds
+
+# The ping frame never changes, so encode it once
+_PING_FRAME = _dumps({"event_type": "ping", "timestamp": None})
+
+# Registered sockets, mapped to the loop time of the client's last message for
+# sockets with idle disconnect enabled (None for the rest)
+_heartbeat_sockets: "weakref.WeakKeyDictionary[WebSocket, Optional[float]]" = weakref.WeakKeyDictionary()
+# Loop time of the last frame sent on connections that report their sends
+_heartbeat_last_send: "weakref.WeakKeyDictionary[WebSocket, float]" = weakref.WeakKeyDictionary()
+_heartbeat_task: Optional[asyncio.Task] = None
+
+
+async def _heartbeat_loop():
+    """Ping registered connections and close those idle past ws_idle_timeout"""
+    loop = asyncio.get_running_loop()
+    while _heartbeat_sockets:
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+
+        now = loop.time()
+        idle_since = now - settings.ws_idle_timeout
+        sent_since = now - HEARTBEAT_INTERVAL
+        live, idle = [], []
+        for ws, last_seen in list(_heartbeat_sockets.items()):
+            if ws.client_state is not _CONNECTED:
+                continue
+            if last_seen is not None and last_seen < idle_since:
+                idle.append(ws)
+                del _heartbeat_sockets[ws]
+            elif last_seen is None and _heartbeat_last_send.get(ws, 0.0) > sent_since:
+                # Traffic went out this interval, which keeps the connection
+                # (and any proxy in between) alive without a ping
+                continue
+            else:
+                live.append(ws)
 
-            if websocket.client_state != WebSocketState.CONNECTED:
-                break
+        await asyncio.gather(
+            *(ws.send_text(_PING_FRAME) for ws in live),
+            *(ws.close(code=1001, reason="Idle timeout") for ws in idle),
+            return_exceptions=True
+        )
 
-            try:
-                await websocket.send_json({
-                    "event_type": "ping",
-                    "timestamp": None
-                })
-            except Exception:
-                break
 
-    except asyncio.CancelledError:
-        pass
+def start_heartbeat(websocket: WebSocket, idle_timeout: bool = False):
+    """
+    Include a connection in the shared keep-alive ping. With idle_timeout, the
+    connection is closed once the client sends nothing (not even a pong) for
+    ws_idle_timeout seconds - call touch_heartbeat on every received message.
+    """
+    global _heartbeat_task
+    _heartbeat_sockets[websocket] = asyncio.get_running_loop().time() if idle_timeout else None
+    if _heartbeat_task is None or _heartbeat_task.done():
+        _heartbeat_task = asyncio.create_task(_heartbeat_loop())
+
+
+def touch_heartbeat(websocket: WebSocket):
+    """Record client activity on a connection with idle disconnect enabled"""
+    if _heartbeat_sockets.get(websocket) is not None:
+        _heartbeat_sockets[websocket] = asyncio.get_running_loop().time()
+
+
+def note_heartbeat_send(websocket: WebSocket):
+    """
+    Record an outbound frame so the next ping can be skipped. Only used for
+    connections without idle disconnect - those need pings to elicit pongs.
+    """
+    _heartbeat_last_send[websocket] = asyncio.get_running_loop().time()
+
+
+def stop_heartbeat(websocket: WebSocket):
+    """Stop pinging a connection"""
+    _heartbeat_sockets.pop(websocket, None)
+    _heartbeat_last_send.pop(websocket, None)
 
 
 @router.websocket("/ws/global")
@@ -976,52 +1200,42 @@ async def global_sync_websocket(
     await websocket.accept()
     logger.info(f"Global WebSocket connected: device={device_id}")
 
-    # Track sessions this device is interested in
-    watched_sessions: set = set()
-
     try:
-        ping_task = asyncio.create_task(ping_loop(websocket, device_id))
+        start_heartbeat(websocket, idle_timeout=True)
 
         try:
             while True:
-                try:
-                    data = await asyncio.wait_for(
-                        websocket.receive_json(),
-                        timeout=60.0
-                    )
+                data = await receive_ws_json(websocket)
+                touch_heartbeat(websocket)
 
-                    msg_type = data.get("type")
-
-                    if msg_type == "watch":
-                        # Start watching a session
-                        session_id = data.get("session_id")
-                        if session_id:
-                            watched_sessions.add(session_id)
-                            await websocket.send_json({
-                                "event_type": "watching",
-                                "session_id": session_id
-                            })
-
-                    elif msg_type == "unwatch":
-                        # Stop watching a session
-                        session_id = data.get("session_id")
-                        if session_id:
-                            watched_sessions.discard(session_id)
-
-                    elif msg_type == "pong":
-                        pass
-
-                except asyncio.TimeoutError:
-                    if websocket.client_state != WebSocketState.CONNECTED:
-                        break
-                    continue
+                msg_type = data.get("type")
+
+                if msg_type == "watch":
+                    # Start watching a session
+                    # Registered with the sync engine, which indexes watchers by
+                    # session so broadcasts only visit that session's watchers.
+                    # IDs are interned so watchers of a session share one string.
+                    session_id = data.get("session_id")
+                    if isinstance(session_id, str) and session_id:
+                        session_id = sys.intern(session_id)
+                        sync_engine.watch(device_id, session_id, websocket)
+                        await send_ws_json(websocket, {
+                            "event_type": "watching",
+                            "session_id": session_id
+                        })
+
+                elif msg_type == "unwatch":
+                    # Stop watching a session
+                    session_id = data.get("session_id")
+                    if isinstance(session_id, str) and session_id:
+                        sync_engine.unwatch(device_id, session_id)
+
+                elif msg_type == "pong":
+                    pass
 
         finally:
-            ping_task.cancel()
-            try:
-                await ping_task
-            except asyncio.CancelledError:
-                pass
+            stop_heartbeat(websocket)
+            sync_engine.unwatch_all(device_id, websocket)
 
     except WebSocketDisconnect:
         logger.info(f"Global WebSocket disconnected: device={device_id}")
@@ -1038,6 +1252,40 @@ async def global_sync_websocket(
 _active_cli_bridges: Dict[str, CLIBridge] = {}
 
 
+def _release_cli_bridge(session_id: str, bridge: Optional[CLIBridge]):
+    """Drop a bridge from the registry unless another connection has replaced it"""
+    if bridge is not None and _active_cli_bridges.get(session_id) is bridge:
+        del _active_cli_bridges[session_id]
+
+
+# Rewind output is parsed from the tail of the CLI output only; markers can
+# straddle two PTY reads, so this much of the previous read is rescanned
+_CLI_OUTPUT_TAIL_BYTES = 65536
+_REWIND_MARKERS = tuple(m.encode() for m in RewindParser.COMPLETION_MARKERS)
+_REWIND_MARKER_OVERLAP = max(len(m) for m in _REWIND_MARKERS) - 1
+
+_CLI_PING_FRAME = _dumps({"type": "ping"})
+
+# Restore choices listed in every rewind_complete message; only the checkpoint
+# message and selected option vary, so the rest of the frame is encoded once
+_REWIND_OPTIONS = {
+    1: "Restore code and conversation",
+    2: "Restore conversation",
+    3: "Restore code",
+    4: "Never mind"
+}
+_REWIND_COMPLETE_SUFFIX = ',"options":' + _dumps(_REWIND_OPTIONS) + "}"
+
+
+def _rewind_complete_frame(checkpoint_message: Optional[str], selected_option: Optional[int]) -> str:
+    """Encode a rewind_complete message from the pre-encoded template"""
+    return (
+        '{"type":"rewind_complete","checkpoint_message":' + _dumps(checkpoint_message)
+        + ',"selected_option":' + _dumps(selected_option)
+        + _REWIND_COMPLETE_SUFFIX
+    )
+
+
 @router.websocket("/ws/cli/{session_id}")
 async def cli_websocket(
     websocket: WebSocket,
@@ -1051,8 +1299,10 @@ async def cli_websocket(
     to render a terminal and interact with commands that require
     keyboard input (arrow keys, Enter, etc.).
 
+    Terminal output is sent as binary frames holding the raw PTY bytes
+    (including ANSI codes); everything else is a JSON text frame.
+
     Message types FROM server:
-    - output: Terminal output data (may include ANSI codes)
     - ready: CLI is ready for input
     - exit: CLI process has exited
     - error: Error occurred
@@ -1072,78 +1322,113 @@ async def cli_websocket(
         await websocket.close(code=4001, reason="Authentication failed")
         return
 
-    # Get session info
-    session = database.get_session(session_id)
+    # Get session info and its project's path in one query
+    session, project_path = await asyncio.to_thread(database.get_session_with_project_path, session_id)
     if not session:
         await websocket.close(code=4004, reason="Session not found")
         return
 
     sdk_session_id = session.get("sdk_session_id")
     if not sdk_session_id:
-        await websocket.send_json({
+        await send_ws_json(websocket, {
             "type": "error",
             "message": "Session has no SDK session ID - cannot use CLI commands"
         })
         await websocket.close(code=4005, reason="No SDK session")
         return
 
-    # Get working directory from project or profile
-    working_dir = "/workspace"
-    project_id = session.get("project_id")
-    if project_id:
-        project = database.get_project(project_id)
-        if project:
-            from app.core.config import settings
-            working_dir = str(settings.workspace_dir / project["path"])
+    working_dir = _session_working_dir(project_path)
 
     logger.info(f"CLI WebSocket connected for session {session_id}, sdk_session={sdk_session_id}")
 
     cli_bridge: Optional[CLIBridge] = None
-    output_buffer = ""  # For parsing rewind output
-
-    async def on_output(data: str):
+    # Bounded tail of the output for parsing rewind results
+    output_tail: Deque[bytes] = deque()
+    output_tail_bytes = 0
+    rewind_marker_seen = False
+
+    # PTY reads are coalesced: on_output only queues the chunk and a flusher
+    # sends everything collected within a short window as one output frame
+    pending_output: List[bytes] = []
+    pending_bytes = 0
+    output_ready = asyncio.Event()
+    flush_delay = settings.cli_output_flush_ms / 1000
+
+    async def on_output(data: bytes):
         """Handle CLI output"""
-        nonlocal output_buffer
-        output_buffer += data
-
-        if websocket.client_state == WebSocketState.CONNECTED:
-            await websocket.send_json({
-                "type": "output",
-                "data": data
-            })
+        nonlocal output_tail_bytes, rewind_marker_seen, pending_bytes
+        # Only the new data (plus the previous read's edge) is scanned for a
+        # completion marker; the full tail is parsed just when one shows up
+        window = output_tail[-1][-_REWIND_MARKER_OVERLAP:] + data if output_tail else data
+        if any(marker in window for marker in _REWIND_MARKERS):
+            rewind_marker_seen = True
+
+        output_tail.append(data)
+        output_tail_bytes += len(data)
+        while output_tail_bytes - len(output_tail[0]) >= _CLI_OUTPUT_TAIL_BYTES:
+            output_tail_bytes -= len(output_tail.popleft())
+
+        pending_output.append(data)
+        pending_bytes += len(data)
+        output_ready.set()
+
+        # The client isn't keeping up - stop reading so the CLI blocks on its
+        # PTY instead of output piling up here
+        if pending_bytes >= settings.cli_output_pause_bytes and cli_bridge:
+            cli_bridge.pause_reads()
+
+    async def flush_output():
+        """Send pending output as a single frame, then check for rewind completion"""
+        nonlocal pending_bytes, rewind_marker_seen
+        if not pending_output:
+            return
+
+        block = b"".join(pending_output)
+        pending_output.clear()
+        pending_bytes = 0
+
+        if websocket.client_state is _CONNECTED:
+            # Raw bytes skip JSON escaping; xterm decodes UTF-8 itself
+            await websocket.send_bytes(block)
+            if pending_bytes < settings.cli_output_resume_bytes and cli_bridge:
+                cli_bridge.resume_reads()
 
             # Check if rewind completed
-            if RewindParser.is_rewind_complete(output_buffer):
-                checkpoint_msg = RewindParser.get_selected_checkpoint_message(output_buffer)
-                selected_option = RewindParser.parse_selected_option(output_buffer)
-
-                await websocket.send_json({
-                    "type": "rewind_complete",
-                    "checkpoint_message": checkpoint_msg,
-                    "selected_option": selected_option,
-                    "options": {
-                        1: "Restore code and conversation",
-                        2: "Restore conversation",
-                        3: "Restore code",
-                        4: "Never mind"
-                    }
-                })
+            if rewind_marker_seen:
+                rewind_marker_seen = False
+                output = b"".join(output_tail).decode("utf-8", errors="replace")
+                checkpoint_msg, selected_option = RewindParser.parse_result(output)
+                await websocket.send_text(_rewind_complete_frame(checkpoint_msg, selected_option))
+
+    async def output_flush_loop():
+        """Flush coalesced output every flush window, or sooner once enough is pending"""
+        try:
+            while True:
+                await output_ready.wait()
+                output_ready.clear()
+                if flush_delay > 0 and pending_bytes < settings.cli_output_flush_bytes:
+                    await asyncio.sleep(flush_delay)
+                await flush_output()
+        except Exception as e:
+            logger.debug(f"CLI output flusher stopped for session {session_id}: {e}")
 
     async def on_exit(exit_code: int):
         """Handle CLI exit"""
-        if websocket.client_state == WebSocketState.CONNECTED:
-            await websocket.send_json({
+        # Deliver any output still waiting for the flush window first
+        await flush_output()
+        if websocket.client_state is _CONNECTED:
+            await send_ws_json(websocket, {
                 "type": "exit",
                 "exit_code": exit_code
             })
 
+    flush_task = asyncio.create_task(output_flush_loop())
+
     try:
         while True:
             try:
-                data = await asyncio.wait_for(
-                    websocket.receive_json(),
-                    timeout=300.0  # 5 minute timeout for CLI operations
-                )
+                async with asyncio.timeout(300.0):  # 5 minute timeout for CLI operations
+                    data = await receive_ws_json(websocket)
 
                 msg_type = data.get("type")
 
@@ -1153,8 +1438,13 @@ async def cli_websocket(
 
                     if cli_bridge and cli_bridge.is_running:
                         await cli_bridge.stop()
+                    _release_cli_bridge(session_id, cli_bridge)
 
-                    output_buffer = ""  # Reset buffer
+                    output_tail.clear()  # Reset buffer
+                    output_tail_bytes = 0
+                    rewind_marker_seen = False
+                    pending_output.clear()
+                    pending_bytes = 0
 
                     cli_bridge = CLIBridge(
                         session_id=session_id,
@@ -1167,12 +1457,12 @@ async def cli_websocket(
                     success = await cli_bridge.start(command)
                     if success:
                         _active_cli_bridges[session_id] = cli_bridge
-                        await websocket.send_json({
+                        await send_ws_json(websocket, {
                             "type": "ready",
                             "command": command
                         })
                     else:
-                        await websocket.send_json({
+                        await send_ws_json(websocket, {
                             "type": "error",
                             "message": "Failed to start CLI"
                         })
@@ -1198,16 +1488,17 @@ async def cli_websocket(
                     # Stop CLI
                     if cli_bridge:
                         await cli_bridge.stop()
+                        _release_cli_bridge(session_id, cli_bridge)
                         cli_bridge = None
 
                 elif msg_type == "pong":
                     pass
 
             except asyncio.TimeoutError:
-                if websocket.client_state != WebSocketState.CONNECTED:
+                if websocket.client_state is not _CONNECTED:
                     break
                 # Send ping
-                await websocket.send_json({"type": "ping"})
+                await websocket.send_text(_CLI_PING_FRAME)
 
     except WebSocketDisconnect:
         logger.info(f"CLI WebSocket disconnected for session {session_id}")
@@ -1219,5 +1510,5 @@ async def cli_websocket(
         # Clean up CLI bridge
         if cli_bridge:
             await cli_bridge.stop()
-        if session_id in _active_cli_bridges:
-            del _active_cli_bridges[session_id]
+        flush_task.cancel()
+        _release_cli_bridge(session_id, cli_bridge)
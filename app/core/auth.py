@@ -5,22 +5,43 @@ Authentication service for AI Hub
 import os
 import sys
 import shutil
+import hmac
+import hashlib
 import secrets
 import logging
 import subprocess
 import json
+import time
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 
 import bcrypt
 
 from app.db import database
 from app.core.config import settings
+from app.core.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Static get_login_instructions payloads (shared - treat as read-only)
+_AUTHENTICATED_INSTRUCTIONS: Dict[str, Any] = {
+    "status": "authenticated",
+    "message": "Already authenticated with Claude Code"
+}
+_NOT_AUTHENTICATED_INSTRUCTIONS: Dict[str, Any] = {
+    "status": "not_authenticated",
+    "message": "Claude Code login required",
+    "instructions": [
+        "1. Access the container: docker exec -it claude-sdk-agent /bin/bash",
+        "2. Run: claude login",
+        "3. Follow the OAuth prompts in your browser",
+        "4. Return here and refresh"
+    ],
+    "command": "docker exec -it claude-sdk-agent claude login"
+}
+
 
 def find_claude_executable() -> Optional[str]:
     """Find the claude executable, handling Windows/npm installations"""
@@ -94,18 +115,61 @@ class AuthService:
         home = Path(os.environ.get('HOME', '/home/appuser'))
         self.config_dir = home / '.claude'
         self.gh_config_dir = home / '.config' / 'gh'
+        self._creds_file = self.config_dir / '.credentials.json'
+        self._creds_file_str = str(self._creds_file)
+
+        # Environment for claude/gh/git subprocesses, built once rather than per call
+        self._cli_env = {**os.environ, 'HOME': os.environ.get('HOME', str(Path.home()))}
+
+        # (checked_at, result) of the last credentials check; see is_claude_authenticated
+        self._claude_auth_checked: Optional[tuple] = None
 
         # Store active OAuth login process for multi-step flow
         self._claude_login_process = None
         self._claude_login_master_fd = None
 
+        # Admin row, cached once it exists (there is no path that changes or removes it)
+        self._admin: Optional[Dict[str, Any]] = None
+
+        # Session lifetime in seconds; validated token -> expires_at epoch, so
+        # repeat checks skip the DB
+        self._session_ttl = settings.session_expire_days * 86400
+        self._session_cache = TTLCache(maxsize=10_000, ttl=settings.auth_session_cache_ttl)
+
+        # HMAC(username, password, hash) of recently verified logins, so bursts
+        # of logins skip bcrypt. Only successes are kept; the key is per-process
+        self._verify_cache = TTLCache(maxsize=256, ttl=settings.login_verify_cache_ttl)
+        self._verify_key = secrets.token_bytes(32)
+
+        # bcrypt holds a core for the whole key schedule; a bounded pool keeps it
+        # off the event loop and caps parallel hashing during credential stuffing
+        self._bcrypt_pool = ThreadPoolExecutor(
+            max_workers=min(8, os.cpu_count() or 1),
+            thread_name_prefix="bcrypt"
+        )
+
     # =========================================================================
     # Web UI Authentication
     # =========================================================================
 
+    def _get_admin(self) -> Optional[Dict[str, Any]]:
+        """Get the admin row, reading the DB only until it exists"""
+        admin = self._admin
+        if admin is None:
+            admin = database.get_admin()
+            if admin is not None:
+                # Keep the hash as bytes so login hands it straight to bcrypt
+                password_hash = admin["password_hash"]
+                if isinstance(password_hash, str):
+                    admin["password_hash"] = password_hash.encode('utf-8')
+                # Fixed-length digest, so the username compare doesn't leak its length
+                admin["username_digest"] = hashlib.sha256(admin["username"].encode('utf-8')).digest()
+            self._admin = admin
+        return admin
+
     def is_setup_required(self) -> bool:
         """Check if initial setup is required"""
-        return database.is_setup_required()
+        return self._get_admin() is None
 
     def setup_admin(self, username: str, password: str) -> Dict[str, Any]:
         """Create the admin account (first-run only)"""
@@ -115,10 +179,11 @@ class AuthService:
         # Hash password with bcrypt
         password_hash = bcrypt.hashpw(
             password.encode('utf-8'),
-            bcrypt.gensalt()
+            bcrypt.gensalt(rounds=settings.bcrypt_cost)
         ).decode('utf-8')
 
         admin = database.create_admin(username, password_hash)
+        self._admin = None
 
         # Create session token
         token = self.create_session()
@@ -128,28 +193,47 @@ class AuthService:
             "token": token
         }
 
+    async def setup_admin_async(self, username: str, password: str) -> Dict[str, Any]:
+        """setup_admin, run on the bcrypt pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._bcrypt_pool, self.setup_admin, username, password)
+
     def login(self, username: str, password: str) -> Optional[str]:
         """Verify credentials and create session"""
-        admin = database.get_admin()
+        admin = self._get_admin()
         if not admin:
             return None
 
-        if admin["username"] != username:
-            return None
-
-        # Verify password
-        if not bcrypt.checkpw(
-            password.encode('utf-8'),
-            admin["password_hash"].encode('utf-8')
-        ):
-            return None
+        username_bytes = username.encode('utf-8')
+        username_ok = hmac.compare_digest(admin["username_digest"], hashlib.sha256(username_bytes).digest())
+
+        password_hash = admin["password_hash"]
+        password_bytes = password.encode('utf-8')
+        verify_key = hmac.new(
+            self._verify_key,
+            b'\0'.join((username_bytes, password_bytes, password_hash)),
+            'sha256'
+        ).digest()
+
+        # Verify password. bcrypt runs even when the username is wrong, so the
+        # response time doesn't reveal whether the username was right
+        if not self._verify_cache.get(verify_key):
+            password_ok = bcrypt.checkpw(password_bytes, password_hash)
+            if not (username_ok and password_ok):
+                return None
+            self._verify_cache.set(verify_key, True)
 
         return self.create_session()
 
+    async def login_async(self, username: str, password: str) -> Optional[str]:
+        """login, run on the bcrypt pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._bcrypt_pool, self.login, username, password)
+
     def create_session(self) -> str:
         """Create a new auth session token"""
         token = secrets.token_urlsafe(32)
-        expires_at = datetime.utcnow() + timedelta(days=settings.session_expire_days)
+        expires_at = int(time.time()) + self._session_ttl
         database.create_auth_session(token, expires_at)
         return token
 
@@ -157,39 +241,62 @@ class AuthService:
         """Validate a session token"""
         if not token:
             return False
-        session = database.get_auth_session(token)
-        return session is not None
+        expires_at = self._session_cache.get(token)
+        if expires_at is not None:
+            if expires_at > time.time():
+                return True
+            self._session_cache.pop(token)
+            return False
+        expires_at = database.get_auth_session_expiry(token)
+        if expires_at is None:
+            return False
+        self._session_cache.set(token, expires_at)
+        return True
 
     def logout(self, token: str):
         """Invalidate a session"""
         if token:
+            self._session_cache.pop(token)
             database.delete_auth_session(token)
 
     def get_admin_username(self) -> Optional[str]:
         """Get the admin username"""
-        admin = database.get_admin()
+        admin = self._get_admin()
         return admin["username"] if admin else None
 
     # =========================================================================
     # Claude CLI Authentication
     # =========================================================================
 
-    def is_claude_authenticated(self) -> bool:
-        """Check if Claude CLI is authenticated"""
-        creds_file = self.config_dir / '.credentials.json'
-
-        logger.debug(f"Checking for credentials at: {creds_file}")
+    def is_claude_authenticated(self, use_cache: bool = True) -> bool:
+        """
+        Check if Claude CLI is authenticated.
 
-        if not creds_file.exists():
+        Status polls reuse a result up to claude_auth_cache_ttl seconds old;
+        the login flow passes use_cache=False to see new credentials at once.
+        """
+        checked = self._claude_auth_checked
+        if use_cache and checked and time.monotonic() - checked[0] < settings.claude_auth_cache_ttl:
+            return checked[1]
+        result = self._check_claude_credentials()
+        self._claude_auth_checked = (time.monotonic(), result)
+        return result
+
+    def _invalidate_claude_auth(self):
+        """Forget the cached credentials check after login/logout changes"""
+        self._claude_auth_checked = None
+
+    def _check_claude_credentials(self) -> bool:
+        """Check the credentials file on disk"""
+        # One stat covers both "exists" and "has content"
+        try:
+            if os.stat(self._creds_file_str).st_size == 0:
+                logger.debug("Credentials file is empty")
+                return False
+        except FileNotFoundError:
             logger.debug("Credentials file does not exist")
             return False
 
-        # Check if file has content
-        if creds_file.stat().st_size == 0:
-            logger.debug("Credentials file is empty")
-            return False
-
-        logger.debug("Credentials file exists and has content")
         # Ensure onboarding is marked complete when credentials exist
         self._ensure_onboarding_complete()
         return True
@@ -202,7 +309,7 @@ class AuthService:
         Returns:
             Dict with 'valid' boolean and 'error' message if invalid.
         """
-        creds_file = self.config_dir / '.credentials.json'
+        creds_file = self._creds_file
 
         # First check if credentials file exists
         if not creds_file.exists() or creds_file.stat().st_size == 0:
@@ -213,8 +320,6 @@ class AuthService:
             }
 
         try:
-            home_env = os.environ.get('HOME', str(Path.home()))
-
             # Find claude executable
             claude_cmd = find_claude_executable()
             if not claude_cmd:
@@ -234,7 +339,7 @@ class AuthService:
                 text=True,
                 timeout=10,
                 shell=use_shell,
-                env={**os.environ, 'HOME': home_env}
+                env=self._cli_env
             )
 
             # If this works, credentials are likely valid
@@ -312,38 +417,22 @@ class AuthService:
         return {
             "authenticated": self.is_claude_authenticated(),
             "config_dir": str(self.config_dir),
-            "credentials_file": str(self.config_dir / '.credentials.json')
+            "credentials_file": self._creds_file_str
         }
 
     def get_login_instructions(self) -> Dict[str, Any]:
         """Get instructions for Claude CLI login"""
         if self.is_claude_authenticated():
-            return {
-                "status": "authenticated",
-                "message": "Already authenticated with Claude Code"
-            }
-
-        return {
-            "status": "not_authenticated",
-            "message": "Claude Code login required",
-            "instructions": [
-                "1. Access the container: docker exec -it claude-sdk-agent /bin/bash",
-                "2. Run: claude login",
-                "3. Follow the OAuth prompts in your browser",
-                "4. Return here and refresh"
-            ],
-            "command": "docker exec -it claude-sdk-agent claude login"
-        }
+            return _AUTHENTICATED_INSTRUCTIONS
+        return _NOT_AUTHENTICATED_INSTRUCTIONS
 
     def claude_logout(self) -> Dict[str, Any]:
         """Logout from Claude CLI"""
-        creds_file = self.config_dir / '.credentials.json'
+        creds_file = self._creds_file
         cli_success = False
         cli_error = None
 
         try:
-            home_env = os.environ.get('HOME', str(Path.home()))
-
             # Find claude executable
             claude_cmd = find_claude_executable()
             if claude_cmd:
@@ -355,7 +444,7 @@ class AuthService:
                     text=True,
                     timeout=30,
                     shell=use_shell,
-                    env={**os.environ, 'HOME': home_env}
+                    env=self._cli_env
                 )
 
                 if result.returncode == 0:
@@ -370,6 +459,7 @@ class AuthService:
             cli_error = str(e)
 
         # Fallback: directly delete credentials file if it still exists
+        self._invalidate_claude_auth()
         file_deleted = False
         if creds_file.exists():
             try:
@@ -419,13 +509,12 @@ class AuthService:
             if not gh_cmd:
                 return False
 
-            home_env = os.environ.get('HOME', str(Path.home()))
             result = subprocess.run(
                 [gh_cmd, 'auth', 'status'],
                 capture_output=True,
                 text=True,
                 timeout=10,
-                env={**os.environ, 'HOME': home_env}
+                env=self._cli_env
             )
             return result.returncode == 0
         except Exception as e:
@@ -441,13 +530,12 @@ class AuthService:
             try:
                 gh_cmd = find_gh_executable()
                 if gh_cmd:
-                    home_env = os.environ.get('HOME', str(Path.home()))
                     result = subprocess.run(
                         [gh_cmd, 'api', 'user', '-q', '.login'],
                         capture_output=True,
                         text=True,
                         timeout=10,
-                        env={**os.environ, 'HOME': home_env}
+                        env=self._cli_env
                     )
                     if result.returncode == 0:
                         user = result.stdout.strip()
@@ -471,8 +559,6 @@ class AuthService:
                     "error": "Could not find 'gh' command. Please install GitHub CLI."
                 }
 
-            home_env = os.environ.get('HOME', str(Path.home()))
-
             # Ensure config directory exists
             self.gh_config_dir.mkdir(parents=True, exist_ok=True)
 
@@ -483,7 +569,7 @@ class AuthService:
                 capture_output=True,
                 text=True,
                 timeout=30,
-                env={**os.environ, 'HOME': home_env}
+                env=self._cli_env
             )
 
             if result.returncode == 0:
@@ -494,7 +580,7 @@ class AuthService:
                         [git_cmd, 'config', '--global', 'credential.helper', '!gh auth git-credential'],
                         capture_output=True,
                         timeout=10,
-                        env={**os.environ, 'HOME': home_env}
+                        env=self._cli_env
                     )
 
                 logger.info("GitHub CLI login successful")
@@ -539,14 +625,13 @@ class AuthService:
                     "message": "Logged out from GitHub (config removed)"
                 }
 
-            home_env = os.environ.get('HOME', str(Path.home()))
             result = subprocess.run(
                 [gh_cmd, 'auth', 'logout', '--hostname', 'github.com'],
                 input='Y\n',  # Confirm logout
                 capture_output=True,
                 text=True,
                 timeout=30,
-                env={**os.environ, 'HOME': home_env}
+                env=self._cli_env
             )
 
             if result.returncode == 0:
@@ -667,10 +752,11 @@ class AuthService:
         try:
             # If force_reauth, delete existing credentials first
             if force_reauth:
-                creds_file = self.config_dir / '.credentials.json'
+                creds_file = self._creds_file
                 if creds_file.exists():
                     try:
                         creds_file.unlink()
+                        self._invalidate_claude_auth()
                         logger.info(f"Force reauth: deleted credentials file {creds_file}")
                     except Exception as e:
                         logger.warning(f"Failed to delete credentials for force reauth: {e}")
@@ -686,8 +772,6 @@ class AuthService:
             # Clean up any existing login process
             self._cleanup_claude_login_process()
 
-            home_env = os.environ.get('HOME', str(Path.home()))
-
             # Ensure config directory exists
             self.config_dir.mkdir(parents=True, exist_ok=True)
 
@@ -725,7 +809,7 @@ class AuthService:
                         stdout=slave_fd,
                         stderr=slave_fd,
                         close_fds=True,
-                        env={**os.environ, 'HOME': home_env, 'TERM': 'xterm-256color'}
+                        env={**self._cli_env, 'TERM': 'xterm-256color'}
                     )
 
                     os_module.close(slave_fd)
@@ -972,7 +1056,7 @@ class AuthService:
                     logger.info(f"After folder permission: {repr(output[:300] if len(output) > 300 else output)}")
 
                 # Check if we're done (process exited or credentials exist)
-                if self.is_claude_authenticated():
+                if self.is_claude_authenticated(use_cache=False):
                     logger.info("Credentials file detected!")
                     break
 
@@ -988,7 +1072,7 @@ class AuthService:
             self._cleanup_claude_login_process()
 
             # Check if authentication succeeded
-            if self.is_claude_authenticated():
+            if self.is_claude_authenticated(use_cache=False):
                 # Also set hasCompletedOnboarding to prevent CLI from showing onboarding
                 self._ensure_onboarding_complete()
                 return {
@@ -1018,11 +1102,11 @@ class AuthService:
         Poll for Claude authentication status after user completes OAuth flow.
         Returns when authentication is detected or timeout is reached.
         """
-        start_time = datetime.now()
+        start_time = time.monotonic()
         poll_interval = 2  # seconds
 
-        while (datetime.now() - start_time).total_seconds() < timeout_seconds:
-            if self.is_claude_authenticated():
+        while time.monotonic() - start_time < timeout_seconds:
+            if self.is_claude_authenticated(use_cache=False):
                 return {
                     "success": True,
                     "authenticated": True,
@@ -1042,16 +1126,17 @@ class AuthService:
 
     def get_auth_status(self) -> Dict[str, Any]:
         """Get complete authentication status"""
-        setup_required = self.is_setup_required()
+        # One admin read answers both "setup required" and the username
+        admin = self._get_admin()
         claude_auth = self.is_claude_authenticated()
         github_auth = self.is_github_authenticated()
 
         return {
-            "setup_required": setup_required,
+            "setup_required": admin is None,
             "authenticated": False,  # Set by middleware based on session
             "claude_authenticated": claude_auth,
             "github_authenticated": github_auth,
-            "username": self.get_admin_username() if not setup_required else None
+            "username": admin["username"] if admin else None
         }
 
 
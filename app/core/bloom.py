@@ -0,0 +1,36 @@
+"""
+Minimal Bloom filter for fast negative membership checks (e.g. auth tokens)
+"""
+
+import math
+from typing import Iterable
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over SHA-256 hex digests.
+
+    Never gives false negatives; false positives occur at roughly `error_rate`
+    once `capacity` items are added. Bit positions are derived from the digest
+    itself (double hashing), so no extra hashing is done per lookup.
+    """
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.001):
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, hex_digest: str) -> Iterable[int]:
+        digest = bytes.fromhex(hex_digest)
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:16], "little") | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, hex_digest: str) -> None:
+        """Add a SHA-256 hex digest"""
+        for pos in self._positions(hex_digest):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, hex_digest: str) -> bool:
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(hex_digest))
@@ -13,10 +13,10 @@ genuinely require terminal interaction.
 """
 
 import asyncio
+import io
 import logging
 import os
 import pty
-import select
 import struct
 import fcntl
 import termios
@@ -30,6 +30,11 @@ import uuid
 
 logger = logging.getLogger(__name__)
 
+# Bytes taken from the PTY per read, and how many reads may queue up
+# before reading pauses until they have been processed
+READ_CHUNK_SIZE = 65536
+MAX_QUEUED_READS = 64
+
 # Pattern for validating UUID format (used for SDK session IDs)
 UUID_PATTERN = re.compile(r'^[a-f0-9]{8}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{12}$', re.IGNORECASE)
 
@@ -55,7 +60,13 @@ class CLISession:
     is_active: bool = True
     created_at: datetime = field(default_factory=datetime.now)
     command: Optional[str] = None  # Current command being executed
-    output_buffer: str = ""  # Accumulated output
+    # Accumulated output - a StringIO so appends don't copy everything read so far
+    output: io.StringIO = field(default_factory=io.StringIO)
+
+    @property
+    def output_buffer(self) -> str:
+        """All output accumulated so far"""
+        return self.output.getvalue()
 
 
 # Track active CLI sessions
@@ -75,7 +86,7 @@ class CLIBridge:
         session_id: str,
         sdk_session_id: str,
         working_dir: str,
-        on_output: Optional[Callable[[str], Awaitable[None]]] = None,
+        on_output: Optional[Callable[[bytes], Awaitable[None]]] = None,
         on_exit: Optional[Callable[[int], Awaitable[None]]] = None
     ):
         self.session_id = session_id
@@ -89,6 +100,13 @@ class CLIBridge:
         self._read_task: Optional[asyncio.Task] = None
         self._is_running = False
 
+        # PTY output is read by an event loop reader callback into this queue
+        # and processed in order by _read_output
+        self._output_queue: asyncio.Queue = asyncio.Queue()
+        self._reader_added = False
+        self._reads_paused = False
+        self._reached_eof = False
+
         # For handling Claude's theme selection prompt
         self._output_buffer: str = ""
         self._theme_prompt_handled: bool = False
@@ -121,15 +139,8 @@ class CLIBridge:
             # IMPORTANT: Ensure onboarding is complete BEFORE spawning CLI
             # This prevents the Claude CLI from showing the login/onboarding wizard
             # even when credentials exist. Must be done in parent process before fork.
-            from app.core.auth import auth_service
-            home_dir = pwd.getpwuid(os.getuid()).pw_dir
-            creds_path = os.path.join(home_dir, ".claude", ".credentials.json")
-
-            if os.path.exists(creds_path) and os.path.getsize(creds_path) > 0:
-                logger.info(f"Credentials found at {creds_path}, ensuring onboarding is complete")
-                auth_service._ensure_onboarding_complete()
-            else:
-                logger.warning(f"Credentials not found or empty at {creds_path} - CLI may prompt for login")
+            # The checks touch the filesystem, so they run off the event loop.
+            home_dir = await asyncio.to_thread(self._prepare_cli_home)
 
             # Create PTY
             pid, fd = pty.fork()
@@ -200,6 +211,20 @@ class CLIBridge:
             logger.error(f"Failed to start CLI bridge: {e}", exc_info=True)
             return False
 
+    @staticmethod
+    def _prepare_cli_home() -> str:
+        """Mark onboarding complete if credentials exist; returns the home directory"""
+        from app.core.auth import auth_service
+        home_dir = pwd.getpwuid(os.getuid()).pw_dir
+        creds_path = os.path.join(home_dir, ".claude", ".credentials.json")
+
+        if os.path.exists(creds_path) and os.path.getsize(creds_path) > 0:
+            logger.info(f"Credentials found at {creds_path}, ensuring onboarding is complete")
+            auth_service._ensure_onboarding_complete()
+        else:
+            logger.warning(f"Credentials not found or empty at {creds_path} - CLI may prompt for login")
+        return home_dir
+
     def _set_terminal_size(self, cols: int, rows: int):
         """Set the terminal size"""
         if self._fd is not None:
@@ -305,45 +330,89 @@ class CLIBridge:
         else:
             logger.warning(f"Unknown key: {key}")
 
+    def _update_reader(self):
+        """
+        Watch the PTY for output only while reads aren't paused and the queue
+        has room. While unwatched, output backs up in the PTY and the CLI
+        blocks on write - backpressure instead of unbounded buffering.
+        """
+        want_reader = (
+            self._is_running
+            and self._fd is not None
+            and not self._reads_paused
+            and not self._reached_eof
+            and self._output_queue.qsize() < MAX_QUEUED_READS
+        )
+        if want_reader and not self._reader_added:
+            asyncio.get_running_loop().add_reader(self._fd, self._on_readable)
+            self._reader_added = True
+        elif not want_reader and self._reader_added:
+            self._remove_reader()
+
+    def _remove_reader(self):
+        if self._reader_added and self._fd is not None:
+            asyncio.get_running_loop().remove_reader(self._fd)
+        self._reader_added = False
+
+    def _on_readable(self):
+        """Event loop callback: queue whatever the PTY has available"""
+        try:
+            data = os.read(self._fd, READ_CHUNK_SIZE)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            if e.errno != 5:  # EIO just means the process exited
+                logger.error(f"Error reading CLI output: {e}")
+            data = b""
+
+        if not data:
+            # EOF - stop watching and let _read_output wind down
+            self._reached_eof = True
+        self._output_queue.put_nowait(data)
+        self._update_reader()
+
+    def pause_reads(self):
+        """Stop reading CLI output until resume_reads() (e.g. while the client is slow)"""
+        if not self._reads_paused:
+            self._reads_paused = True
+            self._update_reader()
+
+    def resume_reads(self):
+        """Resume reading CLI output after pause_reads()"""
+        if self._reads_paused:
+            self._reads_paused = False
+            self._update_reader()
+
     async def _read_output(self):
         """Read output from the CLI process and send to callback"""
-        loop = asyncio.get_event_loop()
-
         try:
-            while self._is_running and self._fd is not None:
-                # Use select to wait for data with timeout
-                readable, _, _ = select.select([self._fd], [], [], 0.1)
-
-                if readable:
-                    try:
-                        data = os.read(self._fd, 4096)
-                        if data:
-                            output = data.decode("utf-8", errors="replace")
-
-                            # Accumulate output for theme detection
-                            self._output_buffer += output
-
-                            # Check for theme selection prompt and auto-confirm
-                            if not self._theme_prompt_handled:
-                                await self._handle_theme_selection()
-
-                            # Store in buffer
-                            if self.session_id in _cli_sessions:
-                                _cli_sessions[self.session_id].output_buffer += output
-
-                            # Send to callback
-                            if self.on_output:
-                                await self.on_output(output)
-                        else:
-                            # EOF - process exited
-                            break
-                    except OSError as e:
-                        if e.errno == 5:  # EIO - process exited
-                            break
-                        raise
-
-                # Small yield to prevent blocking
-                await asyncio.sleep(0.01)
+            self._update_reader()
+            while True:
+                data = await self._output_queue.get()
+                self._update_reader()
+                if not data:
+                    # EOF - process exited
+                    break
+
+                output = data.decode("utf-8", errors="replace")
+
+                # Check for theme selection prompt and auto-confirm; output
+                # is only accumulated for detection until that is done
+                if not self._theme_prompt_handled:
+                    self._output_buffer += output
+                    await self._handle_theme_selection()
+                    if self._theme_prompt_handled:
+                        self._output_buffer = ""
+
+                # Store in buffer
+                cli_session = _cli_sessions.get(self.session_id)
+                if cli_session:
+                    cli_session.output.write(output)
+
+                # Send raw bytes to callback - decoding each read on its own
+                # would mangle UTF-8 sequences split across reads
+                if self.on_output:
+                    await self.on_output(data)
 
         except asyncio.CancelledError:
             logger.info(f"Read task cancelled for session {self.session_id}")
@@ -355,6 +424,7 @@ class CLIBridge:
     async def _cleanup(self):
         """Clean up resources"""
         self._is_running = False
+        self._remove_reader()
 
         exit_code = 0
         if self._pid:
@@ -427,6 +497,14 @@ class RewindParser:
     Extracts checkpoint information and selected options from CLI output.
     """
 
+    # Text the CLI prints once a rewind has been applied
+    COMPLETION_MARKERS = (
+        "Conversation restored",
+        "Code restored",
+        "restored to",
+        "Successfully rewound"
+    )
+
     @staticmethod
     def parse_checkpoints(output: str) -> list:
         """
@@ -504,17 +582,23 @@ class RewindParser:
             return 4
         return None
 
+    @staticmethod
+    def parse_result(output: str) -> tuple[Optional[str], Optional[int]]:
+        """
+        Extract (checkpoint_message, selected_option) from completed rewind output.
+
+        Combines get_selected_checkpoint_message() and parse_selected_option();
+        callers run it once a completion marker is seen, not on every chunk.
+        """
+        return (
+            RewindParser.get_selected_checkpoint_message(output),
+            RewindParser.parse_selected_option(output)
+        )
+
     @staticmethod
     def is_rewind_complete(output: str) -> bool:
         """Check if rewind operation has completed"""
-        # Look for completion indicators
-        completion_markers = [
-            "Conversation restored",
-            "Code restored",
-            "restored to",
-            "Successfully rewound"
-        ]
-        return any(marker in output for marker in completion_markers)
+        return any(marker in output for marker in RewindParser.COMPLETION_MARKERS)
 
     @staticmethod
     def get_selected_checkpoint_message(output: str) -> Optional[str]:
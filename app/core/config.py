@@ -15,6 +15,8 @@ class Settings(BaseSettings):
     host: str = "0.0.0.0"
     port: int = 8000
     log_level: str = "INFO"
+    server_loop: str = "uvloop"  # uvicorn event loop: uvloop, auto, asyncio (use auto where uvloop is unavailable)
+    server_http: str = "httptools"  # uvicorn HTTP parser: auto, h11, httptools
 
     # Service info
     service_name: str = "ai-hub"
@@ -40,6 +42,9 @@ class Settings(BaseSettings):
     login_attempt_window_minutes: int = 15  # Time window for counting attempts
     lockout_duration_minutes: int = 30  # Duration of lockout after max attempts
 
+    # Security - Password hashing
+    bcrypt_cost: int = 12  # bcrypt log2 work factor for new password hashes (4-31)
+
     # Security - API Key Session
     api_key_session_expire_hours: int = 24  # API key web session duration
 
@@ -55,6 +60,46 @@ class Settings(BaseSettings):
     # Security - Request limits
     max_request_body_mb: int = 50  # Maximum request body size in MB
 
+    # Performance - Response compression
+    gzip_minimum_size: int = 1024  # Only compress responses larger than this (bytes)
+
+    # Performance - Session list caching
+    sessions_list_cache_ttl: float = 2.0  # Seconds to reuse identical session list queries (0 disables)
+
+    # Performance - Parsed JSONL history cache (entries, keyed by file mtime/size)
+    jsonl_parse_cache_size: int = 32
+
+    # Performance - WebSocket auth caching
+    ws_auth_cache_ttl: float = 60.0  # Seconds to remember a validated WebSocket token (0 disables)
+    ws_auth_reject_cache_ttl: float = 5.0  # Seconds to remember a rejected WebSocket token (0 disables)
+
+    # Performance - Session validation caching
+    auth_session_cache_ttl: float = 30.0  # Seconds to trust a validated session token without re-querying (0 disables)
+
+    # Performance - Login verification caching
+    login_verify_cache_ttl: float = 60.0  # Seconds a successful password check is reused for repeat logins (0 disables)
+
+    # Performance - Claude CLI auth status caching
+    claude_auth_cache_ttl: float = 2.0  # Seconds to reuse the credentials file check for status polls (0 disables)
+
+    # Performance - Chat WebSocket outbound batching
+    ws_send_queue_size: int = 1024  # Max queued outbound events per chat connection
+    ws_batch_max_events: int = 64  # Max events coalesced into one "batch" frame
+    ws_batch_window_ms: float = 20.0  # How long the writer waits to coalesce events (0 sends immediately)
+    ws_history_chunk_size: int = 100  # Messages per history_chunk frame when loading long sessions
+
+    # Performance - WebSocket keep-alive
+    ws_idle_timeout: float = 90.0  # Close sync WebSockets whose client sends nothing (not even pongs) for this long
+
+    # Performance - WebSocket transport
+    ws_write_buffer_limit: int = 1048576  # Transport write high-water mark before WebSocket sends wait on drain (bytes)
+
+    # Performance - CLI bridge output coalescing
+    cli_output_flush_ms: float = 16.0  # How long PTY output is collected before it is sent as one frame
+    cli_output_flush_bytes: int = 16384  # Send immediately once this much output is pending
+    cli_output_pause_bytes: int = 4194304  # Stop reading the PTY while this much output awaits a slow client
+    cli_output_resume_bytes: int = 1048576  # Resume reading once pending output drops below this
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
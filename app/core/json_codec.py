@@ -0,0 +1,23 @@
+"""
+Fast JSON encoding for WebSocket frames (orjson with a stdlib fallback)
+"""
+
+import json
+from typing import Any
+
+try:
+    # orjson encodes straight to UTF-8 and is several times faster than the
+    # stdlib json Starlette's send_json/receive_json use
+    import orjson
+
+    def dumps(data: Any) -> str:
+        """Encode data as compact JSON text (non-str dict keys are stringified)"""
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    loads = orjson.loads
+except ImportError:
+    def dumps(data: Any) -> str:
+        """Encode data as compact JSON text (non-str dict keys are stringified)"""
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+    loads = json.loads
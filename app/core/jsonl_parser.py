@@ -20,14 +20,26 @@ Key fields that affect parsing:
 
 import json
 import logging
+import functools
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Generator
+from typing import List, Dict, Any, Optional, Generator, Tuple
 from datetime import datetime
 
 from app.core.config import settings
 
+try:
+    # orjson is several times faster than stdlib json for large JSONL histories
+    # and its JSONDecodeError subclasses json.JSONDecodeError
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 logger = logging.getLogger(__name__)
 
+# Read size for streaming JSONL files (1 MiB)
+JSONL_READ_CHUNK_SIZE = 1 << 20
+
 
 def get_project_dir_name(working_dir: str) -> str:
     """
@@ -85,23 +97,54 @@ def parse_jsonl_file(jsonl_path: Path) -> Generator[Dict[str, Any], None, None]:
     """
     Parse a JSONL file line by line.
 
+    Reads the file in fixed-size binary chunks and splits on newlines, so memory
+    stays bounded by the chunk size plus the longest line regardless of file size.
+
     Yields each parsed JSON object.
     """
     try:
-        with open(jsonl_path, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    yield json.loads(line)
-                except json.JSONDecodeError as e:
-                    logger.warning(f"Failed to parse line {line_num} in {jsonl_path}: {e}")
+        with open(jsonl_path, 'rb') as f:
+            line_num = 0
+            # Pieces of a line that spans chunk boundaries, joined once complete
+            pending: List[bytes] = []
+            while True:
+                chunk = f.read(JSONL_READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                if b"\n" not in chunk:
+                    pending.append(chunk)
                     continue
+                if pending:
+                    pending.append(chunk)
+                    chunk = b"".join(pending)
+                lines = chunk.split(b"\n")
+                tail = lines.pop()
+                pending = [tail] if tail else []
+                for line in lines:
+                    line_num += 1
+                    entry = _parse_jsonl_line(line, line_num, jsonl_path)
+                    if entry is not None:
+                        yield entry
+            if pending:
+                entry = _parse_jsonl_line(b"".join(pending), line_num + 1, jsonl_path)
+                if entry is not None:
+                    yield entry
     except Exception as e:
         logger.error(f"Failed to read JSONL file {jsonl_path}: {e}")
 
 
+def _parse_jsonl_line(line: bytes, line_num: int, jsonl_path: Path) -> Optional[Dict[str, Any]]:
+    """Decode one raw JSONL line, returning None for blank or malformed lines"""
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        return _json_loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        logger.warning(f"Failed to parse line {line_num} in {jsonl_path}: {e}")
+        return None
+
+
 def extract_text_from_content(content: Any) -> str:
     """
     Extract text content from message content which can be string or list of blocks.
@@ -208,7 +251,7 @@ def get_agent_jsonl_paths(sdk_session_id: str, working_dir: str = "/workspace")
                 with open(agent_file, 'r', encoding='utf-8') as f:
                     first_line = f.readline().strip()
                     if first_line:
-                        entry = json.loads(first_line)
+                        entry = _json_loads(first_line)
                         if entry.get("sessionId") == sdk_session_id:
                             agent_files[agent_id] = agent_file
                             logger.debug(f"Found agent file {agent_id} for session {sdk_session_id}")
@@ -309,6 +352,47 @@ def parse_agent_history(agent_path: Path) -> List[Dict[str, Any]]:
     return children
 
 
+def _accumulate_usage(entry: Dict[str, Any], state: Dict[str, Any]) -> None:
+    """Fold one assistant entry's token usage into a running usage state"""
+    message_data = entry.get("message", {})
+    usage = message_data.get("usage", {})
+
+    # Get model
+    if not state["model"]:
+        state["model"] = message_data.get("model")
+
+    # Sum up input/output tokens (these are incremental per turn)
+    state["total_input_tokens"] += usage.get("input_tokens", 0)
+    state["total_output_tokens"] += usage.get("output_tokens", 0)
+
+    # Keep track of latest usage for cache tokens
+    if usage:
+        state["last_usage"] = usage
+
+
+def _new_usage_state() -> Dict[str, Any]:
+    """Empty running usage state for _accumulate_usage"""
+    return {"total_input_tokens": 0, "total_output_tokens": 0, "model": None, "last_usage": {}}
+
+
+def _usage_summary(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the get_session_cost_from_jsonl result from a usage state"""
+    last_usage = state["last_usage"]
+    # Cache tokens from final message represent current cache state
+    # - cache_creation_input_tokens: take from last message (represents final cache size)
+    # - cache_read_input_tokens: take from last message (represents what was read last)
+    # For context window calculation, we need last turn's input tokens (not cumulative)
+    return {
+        "total_tokens_in": state["total_input_tokens"],
+        "total_tokens_out": state["total_output_tokens"],
+        "cache_creation_tokens": last_usage.get("cache_creation_input_tokens", 0),
+        "cache_read_tokens": last_usage.get("cache_read_input_tokens", 0),
+        # Last turn's input tokens for context calculation
+        "last_input_tokens": last_usage.get("input_tokens", 0),
+        "model": state["model"]
+    }
+
+
 def parse_session_history(
     sdk_session_id: str,
     working_dir: str = "/workspace"
@@ -316,6 +400,20 @@ def parse_session_history(
     """
     Parse a session's JSONL history file and return messages in streaming format.
 
+    See parse_session for details.
+    """
+    messages, _ = parse_session(sdk_session_id, working_dir)
+    return messages
+
+
+def parse_session(
+    sdk_session_id: str,
+    working_dir: str = "/workspace"
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Parse a session's JSONL history file into streaming-format messages and
+    token usage in a single pass over the file.
+
     This transforms the JSONL format to match the format used by live streaming,
     ensuring visual consistency between resumed and live sessions.
 
@@ -327,18 +425,60 @@ def parse_session_history(
         working_dir: The working directory for finding the project
 
     Returns:
-        List of messages in the same format as WebSocket streaming events
-        Each message has: id, role, content, type, toolName, toolId, toolInput, metadata, streaming
+        (messages, usage) where messages are in the same format as WebSocket
+        streaming events (id, role, content, type, toolName, toolId, toolInput,
+        metadata, streaming) and usage matches get_session_cost_from_jsonl
+
+    Results are cached by the session and agent files' mtime/size, so reopening
+    an unchanged session costs a few stat() calls instead of a full parse.
     """
     jsonl_path = get_session_jsonl_path(sdk_session_id, working_dir)
     if not jsonl_path:
         logger.warning(f"JSONL file not found for session {sdk_session_id}")
-        return []
-
-    logger.info(f"Parsing JSONL history from {jsonl_path}")
+        return [], {}
 
     # Find all agent files for this session
     agent_files = get_agent_jsonl_paths(sdk_session_id, working_dir)
+
+    try:
+        fingerprint = (
+            _file_fingerprint(jsonl_path),
+            tuple(sorted(
+                (agent_id, str(agent_path), _file_fingerprint(agent_path))
+                for agent_id, agent_path in agent_files.items()
+            ))
+        )
+    except OSError:
+        return _parse_session_files(jsonl_path, agent_files)
+
+    messages, usage = _parse_session_cached(str(jsonl_path), fingerprint)
+    # Fresh containers so callers appending/updating can't corrupt the cache
+    return list(messages), dict(usage)
+
+
+def _file_fingerprint(path: Path) -> Tuple[int, int]:
+    """(mtime_ns, size) - changes whenever the file is appended to or rewritten"""
+    st = path.stat()
+    return st.st_mtime_ns, st.st_size
+
+
+@functools.lru_cache(maxsize=settings.jsonl_parse_cache_size)
+def _parse_session_cached(
+    jsonl_path: str,
+    fingerprint: tuple
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """parse_session result for a specific on-disk state of the files"""
+    agent_files = {agent_id: Path(agent_path) for agent_id, agent_path, _ in fingerprint[1]}
+    return _parse_session_files(Path(jsonl_path), agent_files)
+
+
+def _parse_session_files(
+    jsonl_path: Path,
+    agent_files: Dict[str, Path]
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Single-pass parse of a session JSONL file and its agent files (uncached)"""
+    logger.info(f"Parsing JSONL history from {jsonl_path}")
+
     agent_children_cache: Dict[str, List[Dict[str, Any]]] = {}
 
     # Pre-parse all agent files
@@ -356,9 +496,15 @@ def parse_session_history(
     # Maps tool_use_id to agent info for matching with tool_result
     task_tool_uses: Dict[str, Dict[str, Any]] = {}
 
+    usage_state = _new_usage_state()
+
     for entry in parse_jsonl_file(jsonl_path):
         entry_type = entry.get("type")
 
+        # Usage counts every assistant entry, including ones skipped below
+        if entry_type == "assistant":
+            _accumulate_usage(entry, usage_state)
+
         # Skip non-message entries
         if entry_type in ("queue-operation", "file-history-snapshot"):
             continue
@@ -650,7 +796,7 @@ def parse_session_history(
                 })
 
     logger.info(f"Parsed {len(messages)} messages from JSONL history")
-    return messages
+    return messages, _usage_summary(usage_state)
 
 
 def get_session_cost_from_jsonl(
@@ -674,43 +820,12 @@ def get_session_cost_from_jsonl(
     if not jsonl_path:
         return {}
 
-    total_input_tokens = 0
-    total_output_tokens = 0
-    model = None
-
-    # Track the last usage data - for cache tokens we want the final state
-    last_usage = {}
-
+    usage_state = _new_usage_state()
     for entry in parse_jsonl_file(jsonl_path):
         if entry.get("type") == "assistant":
-            message_data = entry.get("message", {})
-            usage = message_data.get("usage", {})
-
-            # Get model
-            if not model:
-                model = message_data.get("model")
-
-            # Sum up input/output tokens (these are incremental per turn)
-            total_input_tokens += usage.get("input_tokens", 0)
-            total_output_tokens += usage.get("output_tokens", 0)
-
-            # Keep track of latest usage for cache tokens
-            if usage:
-                last_usage = usage
+            _accumulate_usage(entry, usage_state)
 
-    # Cache tokens from final message represent current cache state
-    # - cache_creation_input_tokens: take from last message (represents final cache size)
-    # - cache_read_input_tokens: take from last message (represents what was read last)
-    # For context window calculation, we need last turn's input tokens (not cumulative)
-    return {
-        "total_tokens_in": total_input_tokens,
-        "total_tokens_out": total_output_tokens,
-        "cache_creation_tokens": last_usage.get("cache_creation_input_tokens", 0),
-        "cache_read_tokens": last_usage.get("cache_read_input_tokens", 0),
-        # Last turn's input tokens for context calculation
-        "last_input_tokens": last_usage.get("input_tokens", 0),
-        "model": model
-    }
+    return _usage_summary(usage_state)
 
 
 def list_available_sessions(working_dir: str = "/workspace") -> List[Dict[str, Any]]:
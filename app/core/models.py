@@ -6,6 +6,11 @@ from datetime import datetime
 from typing import Optional, List, Dict, Any
 from pydantic import BaseModel, Field
 
+# Lowercase slug IDs for profiles, projects and subagents. pydantic-core compiles
+# this once per field with Rust's regex crate, a linear-time automaton engine,
+# so it can't backtrack.
+SLUG_ID_PATTERN = r'^[a-z0-9-]+$'
+
 
 # ============================================================================
 # Authentication Models
@@ -121,7 +126,7 @@ class ProfileBase(BaseModel):
 
 class ProfileCreate(ProfileBase):
     """Profile creation request"""
-    id: str = Field(..., pattern=r'^[a-z0-9-]+$', min_length=1, max_length=50)
+    id: str = Field(..., pattern=SLUG_ID_PATTERN, min_length=1, max_length=50)
 
 
 class ProfileUpdate(BaseModel):
@@ -157,7 +162,7 @@ class ProjectBase(BaseModel):
 
 class ProjectCreate(ProjectBase):
     """Project creation request"""
-    id: str = Field(..., pattern=r'^[a-z0-9-]+$', min_length=1, max_length=50)
+    id: str = Field(..., pattern=SLUG_ID_PATTERN, min_length=1, max_length=50)
     settings: Optional[ProjectSettings] = None
 
 
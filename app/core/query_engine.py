@@ -11,7 +11,8 @@ import logging
 import re
 import uuid
 import asyncio
-from typing import Optional, Dict, Any, AsyncGenerator
+import heapq
+from typing import Optional, Dict, Any, AsyncGenerator, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 
@@ -430,10 +431,13 @@ async def stream_query(
     session_id: Optional[str] = None,
     api_user_id: Optional[str] = None,
     device_id: Optional[str] = None  # Source device for sync
-) -> AsyncGenerator[Dict[str, Any], None]:
+) -> AsyncGenerator[Tuple[str, Dict[str, Any]], None]:
     """
     Execute a streaming query using ClaudeSDKClient.
 
+    Yields (event_type, payload) tuples so consumers don't have to look the
+    type back up in every payload.
+
     Following Anvil's SessionManager pattern:
     - Keep clients connected for session lifetime
     - Don't disconnect after each query (causes async context issues)
@@ -443,7 +447,7 @@ async def stream_query(
     # Get profile
     profile = get_profile(profile_id)
     if not profile:
-        yield {"type": "error", "message": f"Profile not found: {profile_id}"}
+        yield "error", {"type": "error", "message": f"Profile not found: {profile_id}"}
         return
 
     # Get project if specified
@@ -451,7 +455,7 @@ async def stream_query(
     if project_id:
         project = database.get_project(project_id)
         if not project:
-            yield {"type": "error", "message": f"Project not found: {project_id}"}
+            yield "error", {"type": "error", "message": f"Project not found: {project_id}"}
             return
 
     # Get or create session in database
@@ -461,7 +465,7 @@ async def stream_query(
     if session_id:
         session = database.get_session(session_id)
         if not session:
-            yield {"type": "error", "message": f"Session not found: {session_id}"}
+            yield "error", {"type": "error", "message": f"Session not found: {session_id}"}
             return
         resume_id = session.get("sdk_session_id")
         logger.info(f"Resuming session {session_id} with SDK session {resume_id}")
@@ -513,7 +517,7 @@ async def stream_query(
     )
 
     # Yield init event
-    yield {"type": "init", "session_id": session_id}
+    yield "init", {"type": "init", "session_id": session_id}
 
     # For now, always create a new client for each query.
     # This is simpler and avoids issues with reusing clients that may be in an
@@ -540,7 +544,7 @@ async def stream_query(
         logger.info(f"Connected to Claude SDK for session {session_id}")
     except Exception as e:
         logger.error(f"Failed to connect to Claude SDK for session {session_id}: {e}")
-        yield {"type": "error", "message": f"Connection failed: {e}"}
+        yield "error", {"type": "error", "message": f"Connection failed: {e}"}
         return
 
     state = SessionState(
@@ -595,7 +599,7 @@ async def stream_query(
                 for block in message.content:
                     if isinstance(block, TextBlock):
                         response_text.append(block.text)
-                        yield {"type": "text", "content": block.text}
+                        yield "text", {"type": "text", "content": block.text}
 
                         # Broadcast text chunk to other devices
                         await sync_engine.broadcast_stream_chunk(
@@ -607,7 +611,7 @@ async def stream_query(
                         )
 
                     elif isinstance(block, ToolUseBlock):
-                        yield {
+                        yield "tool_use", {
                             "type": "tool_use",
                             "name": block.name,
                             "input": block.input
@@ -633,7 +637,7 @@ async def stream_query(
                     elif isinstance(block, ToolResultBlock):
                         # Truncate large outputs
                         output = str(block.content)[:2000]
-                        yield {
+                        yield "tool_result", {
                             "type": "tool_result",
                             "name": getattr(block, 'name', 'unknown'),
                             "output": output
@@ -665,7 +669,7 @@ async def stream_query(
                         output = str(block.content)[:2000] if block.content else ""
                         logger.debug(f"UserMessage ToolResultBlock - tool_use_id: {block.tool_use_id}, content length: {len(str(block.content) if block.content else '')}")
 
-                        yield {
+                        yield "tool_result", {
                             "type": "tool_result",
                             "name": "unknown",
                             "tool_use_id": block.tool_use_id,
@@ -704,13 +708,13 @@ async def stream_query(
     except asyncio.CancelledError:
         interrupted = True
         logger.info(f"Query interrupted for session {session_id}")
-        yield {"type": "interrupted", "message": "Query was interrupted"}
+        yield "interrupted", {"type": "interrupted", "message": "Query was interrupted"}
 
     except Exception as e:
         logger.error(f"Stream query error for session {session_id}: {e}")
         # Mark client as disconnected on error
         state.is_connected = False
-        yield {"type": "error", "message": str(e)}
+        yield "error", {"type": "error", "message": str(e)}
 
     finally:
         # Mark as not streaming - but DON'T disconnect the client
@@ -807,7 +811,7 @@ async def stream_query(
 
     # Yield done event (unless already yielded error/interrupted)
     if not interrupted:
-        yield {
+        yield "done", {
             "type": "done",
             "session_id": session_id,
             "metadata": metadata
@@ -1283,22 +1287,30 @@ async def interrupt_session(session_id: str) -> bool:
         return False
 
 
-def get_active_sessions() -> list:
-    """Get list of active session IDs (connected clients)"""
-    return [
-        session_id
+def _recent_session_ids(
+    predicate,
+    limit: int,
+    updated_since: Optional[float]
+) -> list:
+    """Return up to `limit` session IDs matching predicate, most recent activity first"""
+    candidates = (
+        (state.last_activity, session_id)
         for session_id, state in _active_sessions.items()
-        if state.is_connected
-    ]
+        if predicate(state)
+        and (updated_since is None or state.last_activity.timestamp() > updated_since)
+    )
+    # nlargest keeps a heap of size `limit` instead of sorting every session
+    return [session_id for _, session_id in heapq.nlargest(limit, candidates)]
 
 
-def get_streaming_sessions() -> list:
-    """Get list of currently streaming session IDs"""
-    return [
-        session_id
-        for session_id, state in _active_sessions.items()
-        if state.is_streaming
-    ]
+def get_active_sessions(limit: int = 100, updated_since: Optional[float] = None) -> list:
+    """Get active session IDs (connected clients), most recently active first"""
+    return _recent_session_ids(lambda state: state.is_connected, limit, updated_since)
+
+
+def get_streaming_sessions(limit: int = 100, updated_since: Optional[float] = None) -> list:
+    """Get currently streaming session IDs, most recently active first"""
+    return _recent_session_ids(lambda state: state.is_streaming, limit, updated_since)
 
 
 async def stream_to_websocket(
@@ -1539,7 +1551,7 @@ async def stream_to_websocket(
                     if delta_type == "text_delta" and delta.get("text"):
                         # Real-time text streaming chunk
                         text = delta["text"]
-                        logger.debug(f"[WS] StreamEvent text_delta: {len(text)} chars")
+                        logger.debug("[WS] StreamEvent text_delta: %d chars", len(text))
                         yield {
                             "type": "stream_delta",
                             "delta_type": "text",
@@ -1613,7 +1625,7 @@ async def stream_to_websocket(
                         # Check if this text is from a subagent
                         if parent_tool_id and parent_tool_id in task_tool_uses:
                             # Text from subagent - send as subagent_chunk
-                            logger.debug(f"[WS] Subagent chunk len={len(block.text)} for agent={parent_tool_id}")
+                            logger.debug("[WS] Subagent chunk len=%d for agent=%s", len(block.text), parent_tool_id)
                             yield {
                                 "type": "subagent_chunk",
                                 "agent_id": parent_tool_id,
@@ -1624,7 +1636,7 @@ async def stream_to_websocket(
                             # Only send chunk when partial messages is disabled
                             response_text.append(block.text)
                             if not include_partial:
-                                logger.debug(f"[WS] Text chunk len={len(block.text)} for session={session_id}")
+                                logger.debug("[WS] Text chunk len=%d for session=%s", len(block.text), session_id)
                                 yield {"type": "chunk", "content": block.text}
 
                     elif isinstance(block, ToolUseBlock):
@@ -1762,7 +1774,9 @@ async def stream_to_websocket(
                     elif isinstance(block, ToolResultBlock):
                         output = str(block.content)[:2000] if block.content else ""
                         tool_use_id = block.tool_use_id
-                        logger.debug(f"[WS] UserMessage ToolResultBlock - tool_use_id: {tool_use_id}, parent_tool_id: {parent_tool_id}, content length: {len(str(block.content) if block.content else '')}, is_error: {block.is_error}")
+                        if logger.isEnabledFor(logging.DEBUG):
+                            # Guarded - measuring the length stringifies the whole result
+                            logger.debug(f"[WS] UserMessage ToolResultBlock - tool_use_id: {tool_use_id}, parent_tool_id: {parent_tool_id}, content length: {len(str(block.content) if block.content else '')}, is_error: {block.is_error}")
 
                         # Collect tool result for storage
                         tool_messages.append({
@@ -15,6 +15,8 @@ from weakref import WeakSet
 
 from fastapi import WebSocket
 
+from app.core.json_codec import dumps
+
 logger = logging.getLogger(__name__)
 
 
@@ -48,8 +50,12 @@ class DeviceConnection:
 
     async def send_event(self, event: SyncEvent) -> bool:
         """Send an event to this device. Returns False if send failed."""
+        return await self.send_frame(dumps(event.to_dict()))
+
+    async def send_frame(self, frame: str) -> bool:
+        """Send an already-encoded JSON event. Returns False if send failed."""
         try:
-            await self.websocket.send_json(event.to_dict())
+            await self.websocket.send_text(frame)
             self.last_activity = datetime.utcnow()
             return True
         except Exception as e:
@@ -137,6 +143,10 @@ class SyncEngine:
         self._streaming_sessions: Set[str] = set()
         # Buffer for in-progress streaming content per session
         self._streaming_buffers: Dict[str, StreamingBuffer] = {}
+        # Global-socket watchers: session_id -> {device_id: websocket}, plus the
+        # reverse index so a disconnecting device is removed without a scan
+        self._watchers: Dict[str, Dict[str, WebSocket]] = {}
+        self._watched_by_device: Dict[str, Set[str]] = {}
 
     async def register_device(
         self,
@@ -194,6 +204,30 @@ class SyncEngine:
                 if not self._connections[session_id]:
                     del self._connections[session_id]
 
+    def watch(self, device_id: str, session_id: str, websocket: WebSocket):
+        """Notify a device's global socket of a session's events (except stream chunks)"""
+        self._watchers.setdefault(session_id, {})[device_id] = websocket
+        self._watched_by_device.setdefault(device_id, set()).add(session_id)
+
+    def unwatch(self, device_id: str, session_id: str):
+        """Stop notifying a device about a session"""
+        watchers = self._watchers.get(session_id)
+        if watchers is not None:
+            watchers.pop(device_id, None)
+            if not watchers:
+                del self._watchers[session_id]
+        watched = self._watched_by_device.get(device_id)
+        if watched is not None:
+            watched.discard(session_id)
+            if not watched:
+                del self._watched_by_device[device_id]
+
+    def unwatch_all(self, device_id: str, websocket: Optional[WebSocket] = None):
+        """Drop all of a device's watches (only those on websocket, if given)"""
+        for session_id in list(self._watched_by_device.get(device_id, ())):
+            if websocket is None or self._watchers.get(session_id, {}).get(device_id) is websocket:
+                self.unwatch(device_id, session_id)
+
     def get_connected_devices(self, session_id: str) -> List[str]:
         """Get list of device IDs watching a session"""
         if session_id not in self._connections:
@@ -222,27 +256,39 @@ class SyncEngine:
         """
         session_id = event.session_id
 
-        if session_id not in self._connections:
+        # Global watchers only hear about changes, not every streamed chunk
+        watchers = self._watchers.get(session_id) if event.event_type != "stream_chunk" else None
+        watcher_targets = [
+            (device_id, ws) for device_id, ws in watchers.items()
+            if device_id != exclude_device_id
+        ] if watchers else []
+
+        if session_id not in self._connections and not watcher_targets:
             logger.debug(f"No connections for session {session_id}, skipping broadcast")
             return
 
         # Get connections to broadcast to
-        connections = list(self._connections[session_id].values())
+        connections = list(self._connections.get(session_id, {}).values())
         logger.info(f"Broadcasting {event.event_type} to {len(connections)} devices for session {session_id[:8]}...")
 
-        # Send to all devices except the excluded one
-        failed_devices = []
-        for conn in connections:
-            if exclude_device_id and conn.device_id == exclude_device_id:
-                logger.debug(f"Skipping source device {conn.device_id[:8]}")
-                continue
-
-            logger.debug(f"Sending {event.event_type} to device {conn.device_id[:8]}")
-            success = await conn.send_event(event)
-            if not success:
-                failed_devices.append(conn.device_id)
-            else:
-                logger.debug(f"Successfully sent {event.event_type} to device {conn.device_id[:8]}")
+        # Send to all devices except the excluded one. The event is encoded once
+        # and the same frame goes to every device concurrently.
+        targets = [
+            conn for conn in connections
+            if not (exclude_device_id and conn.device_id == exclude_device_id)
+        ]
+        if not targets and not watcher_targets:
+            return
+        frame = dumps(event.to_dict())
+        results = await asyncio.gather(
+            *(conn.send_frame(frame) for conn in targets),
+            *(ws.send_text(frame) for _, ws in watcher_targets),
+            return_exceptions=True
+        )
+        for (device_id, ws), result in zip(watcher_targets, results[len(targets):]):
+            if isinstance(result, Exception) and self._watchers.get(session_id, {}).get(device_id) is ws:
+                self.unwatch(device_id, session_id)
+        failed_devices = [conn.device_id for conn, success in zip(targets, results) if success is not True]
 
         # Clean up failed connections
         if failed_devices:
@@ -0,0 +1,24 @@
+"""
+uvicorn WebSocket protocol with a larger transport write buffer
+"""
+
+import asyncio
+
+from uvicorn.protocols.websockets.websockets_impl import WebSocketProtocol as _UvicornWebSocketProtocol
+
+from app.core.config import settings
+
+
+class WebSocketProtocol(_UvicornWebSocketProtocol):
+    """
+    uvicorn's websockets-based protocol with a raised write high-water mark.
+
+    The websockets library caps the transport buffer at 64 KiB, so streaming
+    a long response makes every send wait on drain() once the client falls a
+    little behind. A 1 MiB buffer lets TCP absorb bursts while drain() still
+    applies backpressure to clients that stop reading.
+    """
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        super().connection_made(transport)
+        transport.set_write_buffer_limits(high=settings.ws_write_buffer_limit)
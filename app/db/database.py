@@ -4,19 +4,26 @@ SQLite database setup and operations
 
 import sqlite3
 import json
+import hashlib
 import logging
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from contextlib import contextmanager
 
 from app.core.config import settings
+from app.core.bloom import BloomFilter
 
 logger = logging.getLogger(__name__)
 
 
 # Schema version for migrations
-SCHEMA_VERSION = 8
+SCHEMA_VERSION = 12
+
+# Max IDs bound per IN (...) clause - well under SQLite's 999 parameter limit
+IN_CLAUSE_CHUNK_SIZE = 500
 
 
 def get_connection() -> sqlite3.Connection:
@@ -166,14 +173,29 @@ def _create_schema(cursor: sqlite3.Cursor):
         )
     """)
 
-    # Auth sessions (login tokens)
+    # Auth sessions (login tokens) - token holds the SHA-256 hex of the session
+    # token, so the index key is fixed-width and a DB dump yields no usable tokens;
+    # expires_at is a Unix epoch (seconds) so expiry checks compare integers
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS auth_sessions (
             token TEXT PRIMARY KEY,
-            expires_at TIMESTAMP NOT NULL,
+            expires_at INTEGER NOT NULL,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     """)
+    # Hash tokens stored in plaintext before schema version 11 (raw tokens
+    # are 43 chars, digests 64) so existing logins survive the upgrade
+    cursor.execute("SELECT token FROM auth_sessions WHERE length(token) != 64")
+    for row in cursor.fetchall():
+        cursor.execute(
+            "UPDATE auth_sessions SET token = ? WHERE token = ?",
+            (_token_hash(row["token"]), row["token"])
+        )
+    # Convert ISO-8601 expiries written before schema version 12 to epochs
+    cursor.execute(
+        "UPDATE auth_sessions SET expires_at = CAST(strftime('%s', expires_at) AS INTEGER) "
+        "WHERE typeof(expires_at) = 'text'"
+    )
 
     # Usage tracking
     cursor.execute("""
@@ -308,7 +330,11 @@ def _create_schema(cursor: sqlite3.Cursor):
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_auth_sessions_expires ON auth_sessions(expires_at)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_api_users_active ON api_users(is_active)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_api_user ON sessions(api_user_id)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sync_log_session ON sync_log(session_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions(updated_at, id)")
+    # (session_id, id) lets /sync polls seek straight to since_id; replaces the
+    # older session_id-only index
+    cursor.execute("DROP INDEX IF EXISTS idx_sync_log_session")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sync_log_session_id ON sync_log(session_id, id)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_sync_log_created ON sync_log(created_at)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_login_attempts_ip ON login_attempts(ip_address)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_login_attempts_created ON login_attempts(created_at)")
@@ -371,15 +397,18 @@ def create_admin(username: str, password_hash: str) -> Dict[str, Any]:
 # Auth Session Operations
 # ============================================================================
 
-def create_auth_session(token: str, expires_at: datetime) -> Dict[str, Any]:
-    """Create an auth session token"""
+def create_auth_session(token: str, expires_at: int) -> Dict[str, Any]:
+    """Create an auth session token (only its hash is stored)"""
+    token_hash = _token_hash(token)
     with get_db() as conn:
         cursor = conn.cursor()
         cursor.execute(
             "INSERT INTO auth_sessions (token, expires_at) VALUES (?, ?)",
-            (token, expires_at.isoformat())
+            (token_hash, expires_at)
         )
-        return {"token": token, "expires_at": expires_at}
+    # Added after commit so a concurrent rebuild can't miss it
+    _add_to_token_filter(token_hash)
+    return {"token": token, "expires_at": expires_at}
 
 
 def get_auth_session(token: str) -> Optional[Dict[str, Any]]:
@@ -388,16 +417,28 @@ def get_auth_session(token: str) -> Optional[Dict[str, Any]]:
         cursor = conn.cursor()
         cursor.execute(
             "SELECT * FROM auth_sessions WHERE token = ? AND expires_at > ?",
-            (token, datetime.utcnow().isoformat())
+            (_token_hash(token), int(time.time()))
         )
         return row_to_dict(cursor.fetchone())
 
 
+def get_auth_session_expiry(token: str) -> Optional[int]:
+    """Get a live auth session's expires_at (Unix epoch), or None if missing/expired"""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT expires_at FROM auth_sessions WHERE token = ? AND expires_at > ?",
+            (_token_hash(token), int(time.time()))
+        )
+        row = cursor.fetchone()
+        return row["expires_at"] if row else None
+
+
 def delete_auth_session(token: str):
     """Delete an auth session"""
     with get_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("DELETE FROM auth_sessions WHERE token = ?", (token,))
+        cursor.execute("DELETE FROM auth_sessions WHERE token = ?", (_token_hash(token),))
 
 
 def cleanup_expired_sessions():
@@ -406,10 +447,65 @@ def cleanup_expired_sessions():
         cursor = conn.cursor()
         cursor.execute(
             "DELETE FROM auth_sessions WHERE expires_at < ?",
-            (datetime.utcnow().isoformat(),)
+            (int(time.time()),)
         )
 
 
+# ============================================================================
+# Auth Token Filter
+# ============================================================================
+
+# Bloom filter of SHA-256 hashes of every credential that could currently
+# authenticate (admin session tokens, API key session tokens, API keys). Lets
+# invalid tokens be rejected without touching the database. Every insert path
+# adds to it; deletions are only dropped on the periodic rebuild, which is fine
+# since a stale entry just falls through to the real DB check.
+_token_filter: Optional[BloomFilter] = None
+_token_filter_lock = threading.Lock()
+
+
+def _token_hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def rebuild_token_filter():
+    """Rebuild the auth token filter from the current valid credentials"""
+    global _token_filter
+    now = datetime.utcnow().isoformat()
+    with _token_filter_lock:
+        with get_db() as conn:
+            cursor = conn.cursor()
+            # Admin session tokens are already stored hashed
+            cursor.execute("SELECT token FROM auth_sessions WHERE expires_at > ?", (int(time.time()),))
+            token_hashes = [row["token"] for row in cursor.fetchall()]
+            cursor.execute("SELECT token FROM api_key_sessions WHERE expires_at > ?", (now,))
+            session_tokens = [row["token"] for row in cursor.fetchall()]
+            # Inactive users included too - they can be re-activated without a new key
+            cursor.execute("SELECT api_key_hash FROM api_users")
+            token_hashes.extend(row["api_key_hash"] for row in cursor.fetchall())
+
+        token_filter = BloomFilter(capacity=max(100_000, 2 * (len(session_tokens) + len(token_hashes))))
+        for token in session_tokens:
+            token_filter.add(_token_hash(token))
+        for token_hash in token_hashes:
+            token_filter.add(token_hash)
+        _token_filter = token_filter
+
+
+def _add_to_token_filter(token_hash: str):
+    with _token_filter_lock:
+        if _token_filter is not None:
+            _token_filter.add(token_hash)
+
+
+def token_may_be_valid(token: str) -> bool:
+    """False if token is definitely not a valid session token or API key"""
+    token_filter = _token_filter
+    if token_filter is None:
+        return True  # Not built yet - defer to the database
+    return _token_hash(token) in token_filter
+
+
 # ============================================================================
 # Profile Operations
 # ============================================================================
@@ -641,6 +737,42 @@ def get_session(session_id: str) -> Optional[Dict[str, Any]]:
         return row_to_dict(cursor.fetchone())
 
 
+def get_session_with_project_path(session_id: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Get a session and its project's path in one query.
+    Returns (None, None) if the session doesn't exist; the path is None when
+    the session has no (existing) project.
+    """
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            """SELECT s.*, p.path AS project_path FROM sessions s
+               LEFT JOIN projects p ON p.id = s.project_id
+               WHERE s.id = ?""",
+            (session_id,)
+        )
+        session = row_to_dict(cursor.fetchone())
+    if session is None:
+        return None, None
+    return session, session.pop("project_path")
+
+
+def get_sessions_by_ids(session_ids: List[str]) -> List[Dict[str, Any]]:
+    """Get several sessions in one round-trip. Unknown IDs are simply absent."""
+    if not session_ids:
+        return []
+    results = []
+    with get_db() as conn:
+        cursor = conn.cursor()
+        # Chunk to stay under SQLite's bound-parameter limit
+        for i in range(0, len(session_ids), IN_CLAUSE_CHUNK_SIZE):
+            chunk = session_ids[i:i + IN_CLAUSE_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            cursor.execute(f"SELECT * FROM sessions WHERE id IN ({placeholders})", chunk)
+            results.extend(rows_to_list(cursor.fetchall()))
+    return results
+
+
 def get_sessions(
     project_id: Optional[str] = None,
     profile_id: Optional[str] = None,
@@ -648,9 +780,16 @@ def get_sessions(
     api_user_id: Optional[str] = None,
     api_users_only: bool = False,
     limit: int = 50,
-    offset: int = 0
+    offset: int = 0,
+    before: Optional[Tuple[str, str]] = None
 ) -> List[Dict[str, Any]]:
-    """Get sessions with optional filters"""
+    """Get sessions with optional filters
+
+    Args:
+        before: Optional (updated_at, id) keyset cursor - only sessions ordered
+                after this position are returned. Preferred over offset for deep
+                pages since it doesn't scan-skip the preceding rows.
+    """
     query = "SELECT * FROM sessions WHERE 1=1"
     params = []
 
@@ -673,7 +812,11 @@ def get_sessions(
         else:
             query += " AND api_user_id IS NULL"
 
-    query += " ORDER BY updated_at DESC LIMIT ? OFFSET ?"
+    if before:
+        query += " AND (updated_at, id) < (?, ?)"
+        params.extend(before)
+
+    query += " ORDER BY updated_at DESC, id DESC LIMIT ? OFFSET ?"
     params.extend([limit, offset])
 
     with get_db() as conn:
@@ -701,6 +844,30 @@ def create_session(
     return get_session(session_id)
 
 
+def create_session_with_first_message(
+    session_id: str,
+    profile_id: str,
+    role: str,
+    content: str,
+    project_id: Optional[str] = None,
+    api_user_id: Optional[str] = None
+) -> None:
+    """Create a new session and store its first message in a single transaction"""
+    now = datetime.utcnow().isoformat()
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            """INSERT INTO sessions (id, profile_id, project_id, title, api_user_id, created_at, updated_at)
+               VALUES (?, ?, ?, NULL, ?, ?, ?)""",
+            (session_id, profile_id, project_id, api_user_id, now, now)
+        )
+        cursor.execute(
+            """INSERT INTO session_messages (session_id, role, content, created_at)
+               VALUES (?, ?, ?, ?)""",
+            (session_id, role, content, now)
+        )
+
+
 def update_session(
     session_id: str,
     sdk_session_id: Optional[str] = None,
@@ -757,6 +924,24 @@ def delete_session(session_id: str) -> bool:
         return cursor.rowcount > 0
 
 
+def delete_sessions_bulk(session_ids: List[str]) -> int:
+    """Delete several sessions (and their messages) in one transaction.
+
+    Returns the number of sessions actually deleted.
+    """
+    if not session_ids:
+        return 0
+    deleted = 0
+    with get_db() as conn:
+        cursor = conn.cursor()
+        for i in range(0, len(session_ids), IN_CLAUSE_CHUNK_SIZE):
+            chunk = session_ids[i:i + IN_CLAUSE_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            cursor.execute(f"DELETE FROM sessions WHERE id IN ({placeholders})", chunk)
+            deleted += cursor.rowcount
+    return deleted
+
+
 # ============================================================================
 # Session Message Operations
 # ============================================================================
@@ -778,6 +963,56 @@ def get_session_messages(session_id: str) -> List[Dict[str, Any]]:
         return rows
 
 
+def get_session_messages_page(
+    session_id: str,
+    limit: int = 200,
+    before_id: Optional[int] = None,
+    content_preview: Optional[int] = 1024
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """Get the most recent window of a session's messages, oldest first.
+
+    Args:
+        limit: Max messages to return
+        before_id: Only messages with id < before_id (for scrolling back)
+        content_preview: Truncate content to this many characters and flag
+                         content_truncated; None returns full content
+
+    Returns:
+        (messages, has_more) - has_more is True if older messages remain
+    """
+    if content_preview:
+        content_cols = "substr(content, 1, ?) AS content, length(content) > ? AS content_truncated"
+        params: List[Any] = [content_preview, content_preview]
+    else:
+        content_cols = "content, 0 AS content_truncated"
+        params = []
+    query = f"""SELECT id, session_id, role, {content_cols}, tool_name, tool_input, metadata, created_at
+                FROM session_messages WHERE session_id = ?"""
+    params.append(session_id)
+    if before_id is not None:
+        query += " AND id < ?"
+        params.append(before_id)
+    # Fetch one extra row to learn whether there is an older page
+    query += " ORDER BY id DESC LIMIT ?"
+    params.append(limit + 1)
+
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        rows = rows_to_list(cursor.fetchall())
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    rows.reverse()
+    for row in rows:
+        row["content_truncated"] = bool(row["content_truncated"])
+        if row.get("tool_input"):
+            row["tool_input"] = json.loads(row["tool_input"]) if isinstance(row["tool_input"], str) else row["tool_input"]
+        if row.get("metadata"):
+            row["metadata"] = json.loads(row["metadata"]) if isinstance(row["metadata"], str) else row["metadata"]
+    return rows, has_more
+
+
 def add_session_message(
     session_id: str,
     role: str,
@@ -929,6 +1164,7 @@ def create_api_user(
                VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
             (user_id, name, api_key_hash, project_id, profile_id, description, now, now)
         )
+    _add_to_token_filter(api_key_hash)
     return get_api_user(user_id)
 
 
@@ -986,6 +1222,7 @@ def update_api_user_key(user_id: str, api_key_hash: str) -> Optional[Dict[str, A
             "UPDATE api_users SET api_key_hash = ?, updated_at = ? WHERE id = ?",
             (api_key_hash, datetime.utcnow().isoformat(), user_id)
         )
+    _add_to_token_filter(api_key_hash)
     return get_api_user(user_id)
 
 
@@ -1073,6 +1310,45 @@ def get_latest_sync_id(session_id: str) -> int:
         return row["max_id"] or 0
 
 
+def get_session_change_state(session_id: str) -> Tuple[int, int]:
+    """Get a session's latest sync log ID and latest message ID in one query"""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            """SELECT (SELECT MAX(id) FROM sync_log WHERE session_id = ?) as max_sync_id,
+                      (SELECT MAX(id) FROM session_messages WHERE session_id = ?) as max_message_id""",
+            (session_id, session_id)
+        )
+        row = cursor.fetchone()
+        return row["max_sync_id"] or 0, row["max_message_id"] or 0
+
+
+def get_sync_logs_with_latest(
+    session_id: str,
+    since_id: int = 0,
+    limit: int = 100
+) -> Tuple[List[Dict[str, Any]], int]:
+    """Get sync log entries since since_id plus the latest sync ID in one connection"""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            """SELECT * FROM sync_log
+               WHERE session_id = ? AND id > ?
+               ORDER BY id ASC
+               LIMIT ?""",
+            (session_id, since_id, limit)
+        )
+        rows = rows_to_list(cursor.fetchall())
+        for row in rows:
+            if row.get("data"):
+                row["data"] = json.loads(row["data"]) if isinstance(row["data"], str) else row["data"]
+        cursor.execute(
+            "SELECT MAX(id) as max_id FROM sync_log WHERE session_id = ?",
+            (session_id,)
+        )
+        return rows, cursor.fetchone()["max_id"] or 0
+
+
 def cleanup_old_sync_logs(max_age_hours: int = 24):
     """Remove sync log entries older than max_age_hours"""
     from datetime import timedelta
@@ -1248,7 +1524,8 @@ def create_api_key_session(token: str, api_user_id: str, expires_at: datetime) -
             "INSERT INTO api_key_sessions (token, api_user_id, expires_at) VALUES (?, ?, ?)",
             (token, api_user_id, expires_at.isoformat())
         )
-        return {"token": token, "api_user_id": api_user_id, "expires_at": expires_at}
+    _add_to_token_filter(_token_hash(token))
+    return {"token": token, "api_user_id": api_user_id, "expires_at": expires_at}
 
 
 def get_api_key_session(token: str) -> Optional[Dict[str, Any]]:
@@ -1265,6 +1542,39 @@ def get_api_key_session(token: str) -> Optional[Dict[str, Any]]:
         return row_to_dict(cursor.fetchone())
 
 
+def resolve_access_token(token: str, api_key_hash: Optional[str] = None) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    """
+    Resolve a token in one query: admin session, API key web session, or -
+    when api_key_hash is given - a raw API key (matched in that order).
+    Returns (True, None) for admin, (True, api_user) for an active API user,
+    and (False, None) when nothing matches.
+    """
+    now = datetime.utcnow().isoformat()
+    with get_db() as conn:
+        cursor = conn.cursor()
+        # Every branch yields api_users columns (all NULL for the admin match)
+        cursor.execute(
+            """SELECT 0 AS match_rank, au.* FROM auth_sessions s
+               LEFT JOIN api_users au ON 0
+               WHERE s.token = ? AND s.expires_at > ?
+               UNION ALL
+               SELECT 1, au.* FROM api_key_sessions aks
+               JOIN api_users au ON au.id = aks.api_user_id
+               WHERE aks.token = ? AND aks.expires_at > ? AND au.is_active = TRUE
+               UNION ALL
+               SELECT 2, au.* FROM api_users au
+               WHERE au.api_key_hash = ? AND au.is_active = TRUE
+               ORDER BY match_rank LIMIT 1""",
+            (_token_hash(token), int(time.time()), token, now, api_key_hash)
+        )
+        row = row_to_dict(cursor.fetchone())
+    if row is None:
+        return False, None
+    if row.pop("match_rank") == 0:
+        return True, None
+    return True, row
+
+
 def delete_api_key_session(token: str):
     """Delete an API key session"""
     with get_db() as conn:
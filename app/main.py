@@ -11,6 +11,7 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 from starlette.middleware.base import BaseHTTPMiddleware
 
@@ -101,6 +102,9 @@ async def periodic_cleanup():
             database.cleanup_old_sync_logs(max_age_hours=24)
             database.cleanup_old_login_attempts(max_age_hours=24)
 
+            # Drop expired/deleted credentials from the auth token filter
+            database.rebuild_token_filter()
+
             logger.debug("Periodic cleanup cycle completed")
 
         except asyncio.CancelledError:
@@ -116,6 +120,7 @@ async def lifespan(app: FastAPI):
     """Application lifecycle manager"""
     logger.info("=" * 60)
     logger.info(f"Starting AI Hub v{settings.version}")
+    logger.info(f"Event loop: {type(asyncio.get_running_loop()).__module__}")
     logger.info("=" * 60)
 
     # Ensure directories exist
@@ -127,12 +132,19 @@ async def lifespan(app: FastAPI):
     # Run database migrations
     run_migrations()
 
+    # Load valid auth tokens into the WebSocket pre-auth filter
+    database.rebuild_token_filter()
+
     # Check Claude CLI authentication
     if auth_service.is_claude_authenticated():
         logger.info("Claude CLI: Authenticated")
     else:
         logger.warning("Claude CLI: Not authenticated - run 'claude login' in container")
 
+    # Cache the Claude CLI version so /version doesn't fork a process per request
+    claude_version = await system.refresh_claude_version()
+    logger.info(f"Claude CLI version: {claude_version or 'unavailable'}")
+
     # Check if setup is required
     if auth_service.is_setup_required():
         logger.info("Admin setup required - visit /setup to create admin account")
@@ -191,6 +203,10 @@ class LimitRequestBodyMiddleware(BaseHTTPMiddleware):
 
 app.add_middleware(LimitRequestBodyMiddleware)
 
+# Response compression for large JSON payloads (session lists, history, sync logs)
+# SSE routes set "Content-Encoding: identity" so they are passed through uncompressed
+app.add_middleware(GZipMiddleware, minimum_size=settings.gzip_minimum_size)
+
 # CORS middleware - configure origins via CORS_ORIGINS environment variable
 # Use "*" only for development; in production, specify exact origins
 cors_origins = [origin.strip() for origin in settings.cors_origins.split(",") if origin.strip()]
@@ -277,10 +293,19 @@ if static_dir.exists():
 if __name__ == "__main__":
     import uvicorn
 
+    from app.core.ws_protocol import WebSocketProtocol
+
+    # uvloop and httptools ship with uvicorn[standard] - the C event loop and
+    # HTTP parser noticeably cut per-request, per-stream-event and WebSocket
+    # send/receive/timer overhead. Requesting uvloop explicitly (rather than
+    # "auto") makes a missing uvloop fail loudly instead of silently falling back
     uvicorn.run(
         "app.main:app",
         host=settings.host,
         port=settings.port,
         log_level=settings.log_level.lower(),
+        loop=settings.server_loop,
+        http=settings.server_http,
+        ws=WebSocketProtocol,
         reload=False
     )
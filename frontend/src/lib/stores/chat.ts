@@ -108,6 +108,8 @@ function createChatStore() {
 	let pingTimer: ReturnType<typeof setInterval> | null = null;
 	let reconnectAttempts = 0;
 	const maxReconnectDelay = 30000;
+	// Chunked history (history_start/history_chunk/history_end) being reassembled
+	let pendingHistory: Record<string, unknown> | null = null;
 
 	/**
 	 * Calculate exponential backoff delay with jitter
@@ -218,7 +220,14 @@ function createChatStore() {
 		ws.onmessage = (event) => {
 			try {
 				const data = JSON.parse(event.data);
-				handleMessage(data);
+				// The server coalesces bursts of events into a single batch frame
+				if (data.type === 'batch') {
+					for (const item of data.events) {
+						handleMessage(item);
+					}
+				} else {
+					handleMessage(data);
+				}
 			} catch (e) {
 				console.error('[Chat] Failed to parse message:', e);
 			}
@@ -445,6 +454,28 @@ function createChatStore() {
 		}
 
 		switch (msgType) {
+			case 'history_start': {
+				// Long history sent in pieces - collect it, then handle as one history message
+				pendingHistory = { ...data, type: 'history', messages: [] };
+				break;
+			}
+
+			case 'history_chunk': {
+				if (pendingHistory && pendingHistory.session_id === data.session_id) {
+					(pendingHistory.messages as unknown[]).push(...(data.messages as unknown[]));
+				}
+				break;
+			}
+
+			case 'history_end': {
+				const completed = pendingHistory;
+				pendingHistory = null;
+				if (completed && completed.session_id === data.session_id) {
+					handleMessage(completed);
+				}
+				break;
+			}
+
 			case 'history': {
 				// Session history loaded - handle both JSONL format and legacy DB format
 				const messages = (data.messages as Array<Record<string, unknown>>)?.map((m, i) => {
@@ -129,6 +129,8 @@ const tabPingTimers: Map<string, ReturnType<typeof setInterval>> = new Map();
 const tabReconnectTimers: Map<string, ReturnType<typeof setTimeout>> = new Map();
 // Track tabs waiting for history response - queue sync events until history arrives
 const tabsWaitingForHistory: Map<string, Array<Record<string, unknown>>> = new Map();
+// Chunked history (history_start/history_chunk/history_end) being reassembled per tab
+const tabHistoryChunks: Map<string, Record<string, unknown>> = new Map();
 
 // Interface for persisted tab state (only what we need to restore tabs)
 interface PersistedTab {
@@ -421,7 +423,14 @@ function createTabsStore() {
 		ws.onmessage = (event) => {
 			try {
 				const data = JSON.parse(event.data);
-				handleTabMessage(tabId, data);
+				// The server coalesces bursts of events into a single batch frame
+				if (data.type === 'batch') {
+					for (const item of data.events) {
+						handleTabMessage(tabId, item);
+					}
+				} else {
+					handleTabMessage(tabId, data);
+				}
 			} catch (e) {
 				console.error(`[Tab ${tabId}] Failed to parse message:`, e);
 			}
@@ -446,6 +455,7 @@ function createTabsStore() {
 
 		// Clear any waiting for history state
 		tabsWaitingForHistory.delete(tabId);
+		tabHistoryChunks.delete(tabId);
 
 		const ws = tabConnections.get(tabId);
 		if (ws) {
@@ -1058,6 +1068,29 @@ function createTabsStore() {
 		}
 
 		switch (msgType) {
+			case 'history_start': {
+				// Long history sent in pieces - collect it, then handle as one history message
+				tabHistoryChunks.set(tabId, { ...data, type: 'history', messages: [] });
+				break;
+			}
+
+			case 'history_chunk': {
+				const pending = tabHistoryChunks.get(tabId);
+				if (pending && pending.session_id === data.session_id) {
+					(pending.messages as unknown[]).push(...(data.messages as unknown[]));
+				}
+				break;
+			}
+
+			case 'history_end': {
+				const pending = tabHistoryChunks.get(tabId);
+				tabHistoryChunks.delete(tabId);
+				if (pending && pending.session_id === data.session_id) {
+					handleTabMessage(tabId, pending);
+				}
+				break;
+			}
+
 			case 'history': {
 				// Handle both JSONL format (with explicit type) and legacy DB format
 				const rawMessages = (data.messages as Array<Record<string, unknown>>) || [];